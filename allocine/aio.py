@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""Asyncio facade for Allociné.
+
+The upstream calls are still made with the ``requests`` based :class:`Client`,
+but they run in an executor so that they can be awaited (and gathered)
+without blocking the event loop.
+"""
+
+import asyncio
+import threading
+from functools import partial
+from typing import List, Optional
+
+from allocine.client import Client
+from .core import Allocine
+from .constants import (
+    BASE_URL,
+    DEFAULT_LOOKAHEAD,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PAGE_SIZE,
+)
+
+
+async def _run_in_executor(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+# === Client running the blocking requests in an executor ===
+class AsyncClient:
+    def __init__(self, base_url=BASE_URL, client=None, executor=None):
+        self.client = client if client is not None else Client(base_url=base_url)
+        self.executor = executor  # None means the default executor of the loop
+
+    async def get_showtimelist_by_cinema_id(
+        self, allocine_cinema_id: str, page: int = 1, count: int = 10
+    ):
+        return await _run_in_executor(
+            self.executor,
+            self.client.get_showtimelist_by_cinema_id,
+            allocine_cinema_id=allocine_cinema_id,
+            page=page,
+            count=count,
+        )
+
+    async def get_cinema_info_by_id(self, allocine_cinema_id: str):
+        return await _run_in_executor(
+            self.executor, self.client.get_cinema_info_by_id, allocine_cinema_id
+        )
+
+    async def get_showtimelist_from_geocode(
+        self, geocode: int, page: int = 1, count: int = 10
+    ):
+        return await _run_in_executor(
+            self.executor,
+            self.client.get_showtimelist_from_geocode,
+            geocode=geocode,
+            page=page,
+            count=count,
+        )
+
+    async def get_movie_info_by_id(self, movie_id: int):
+        return await _run_in_executor(
+            self.executor, self.client.get_movie_info_by_id, movie_id
+        )
+
+
+# === Main async class ===
+class AsyncAllocine:
+    """Same API as :class:`Allocine`, as coroutines.
+    Within a call, the theater and movie info of a page are fetched concurrently
+    (up to `max_concurrency` requests at once), and several calls can be gathered.
+    """
+
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        client=None,
+        cache=None,
+        movie_cache=None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        lazy_details: bool = False,
+        prefetch_member_cards: bool = False,
+        executor=None,
+    ):
+        self.__allocine = Allocine(
+            base_url=base_url,
+            max_concurrency=max_concurrency,
+            client=client,
+            cache=cache,
+            movie_cache=movie_cache,
+            page_size=page_size,
+            lazy_details=lazy_details,
+            prefetch_member_cards=prefetch_member_cards,
+        )
+        self.executor = executor  # None means the default executor of the loop
+
+    async def get_cinema(self, allocine_cinema_id: str):
+        return await _run_in_executor(
+            self.executor, self.__allocine.get_cinema, allocine_cinema_id
+        )
+
+    async def get_cinemas(self, allocine_cinema_ids: List[str]):
+        return await _run_in_executor(
+            self.executor, self.__allocine.get_cinemas, allocine_cinema_ids
+        )
+
+    async def get_cinema_ids(self, geocode: int):
+        return await _run_in_executor(
+            self.executor, self.__allocine.get_cinema_ids, geocode
+        )
+
+    async def get_cinemas_from_geocode(self, geocode: int):
+        return await _run_in_executor(
+            self.executor, self.__allocine.get_cinemas_from_geocode, geocode
+        )
+
+    async def search_cinemas(self, geocode: int):
+        return await _run_in_executor(
+            self.executor, self.__allocine.search_cinemas, geocode
+        )
+
+    async def iter_cinemas(
+        self,
+        geocode: int,
+        distance_max_inclusive: Optional[int] = None,
+        lookahead: int = DEFAULT_LOOKAHEAD,
+    ):
+        """Asynchronous generator of the cinemas of a geocode (see Allocine.iter_cinemas)"""
+        cinemas = self.__allocine.iter_cinemas(
+            geocode=geocode,
+            distance_max_inclusive=distance_max_inclusive,
+            lookahead=lookahead,
+        )
+        # If the caller is cancelled, the next() running in the executor is not
+        # interrupted : close() waits for it (it would raise "generator already executing")
+        lock = threading.Lock()
+
+        def get_next():
+            with lock:
+                return next(cinemas, None)
+
+        def close():
+            with lock:
+                cinemas.close()
+
+        try:
+            while True:
+                cinema = await _run_in_executor(self.executor, get_next)
+                if cinema is None:
+                    return
+                yield cinema
+        finally:
+            await _run_in_executor(self.executor, close)
+
+    async def get_movie_info(self, movie_id: int):
+        return await _run_in_executor(
+            self.executor, self.__allocine.get_movie_info, movie_id
+        )
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""Caches of the API responses (persistent, in a single SQLite file)
+and of the movie info (in memory, shared by the whole process)."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_CACHE_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "allocine"
+    / "responses.sqlite"
+)
+DEFAULT_TTLS = {  # Per endpoint (last part of the url path). None : not cached
+    "movie": timedelta(days=7),
+    "theater": timedelta(days=30),
+    "showtimelist": timedelta(hours=1),
+}
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MOVIE_TTL = timedelta(days=1)
+DEFAULT_MAX_MOVIES = 2048
+DEFAULT_MAX_MOVIE_BYTES = 16 * 1024 * 1024
+
+
+def canonical_url(url: str) -> str:
+    """Returns the url with its query parameters sorted, so that equivalent urls
+    share the same cache entry.
+    > canonical_url("http://a.fr/movie?format=json&code=1")
+    'http://a.fr/movie?code=1&format=json'
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), query, ""))
+
+
+def get_endpoint(url: str) -> str:
+    """> get_endpoint("http://api.allocine.fr/rest/v3/movie?code=1")
+    'movie'
+    """
+    return urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+class ResponseCache:
+    """Cache of the decoded JSON responses, keyed on the canonical url.
+
+    Each endpoint has its own time to live, and the least recently used entries
+    are evicted when the file content exceeds `max_bytes`.
+    The same instance can be used from several threads.
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        ttls: Optional[Dict[str, Optional[timedelta]]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock=time.time,
+    ):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY,"
+            " body TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+
+    def get(self, url: str):
+        """Returns the cached payload of `url`, or None if missing or expired"""
+        key = canonical_url(url)
+        now = self.clock()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, expires_at FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._connection.execute("DELETE FROM responses WHERE url = ?", (key,))
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, url: str, payload) -> bool:
+        """Stores the payload of `url`. Returns False if its endpoint is not cached"""
+        ttl = self.ttls.get(get_endpoint(url))
+        if not ttl:
+            return False
+        body = json.dumps(payload, separators=(",", ":"))
+        now = self.clock()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (url, body, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (canonical_url(url), body, len(body), now + ttl.total_seconds(), now),
+            )
+            self.stores += 1
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Removes the least recently used entries until the size cap is respected"""
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        )
+        evicted_urls = []
+        for url, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            evicted_urls.append((url,))
+            total_size -= size
+        self._connection.executemany("DELETE FROM responses WHERE url = ?", evicted_urls)
+        self.evictions += len(evicted_urls)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class MovieCache:
+    """In-memory LRU cache of the movie info, with a time to live.
+    The least recently used entries are evicted beyond `max_entries`, or when the
+    size of the entries (their compact JSON) exceeds `max_bytes`.
+
+    A single instance (`default_movie_cache`) is shared by every `Allocine`
+    of the process, so the movie info survives between two Flask requests.
+    It can be used from several threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_MOVIES,
+        ttl: timedelta = DEFAULT_MOVIE_TTL,
+        max_bytes: int = DEFAULT_MAX_MOVIE_BYTES,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # movie_id -> (expires_at, movie_info, size)
+        self._size = 0  # Total size of the entries, in bytes
+        self._lock = threading.Lock()
+
+    def get(self, movie_id):
+        """Returns the movie info of `movie_id`, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(movie_id)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    self._remove(movie_id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(movie_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, movie_id, movie_info):
+        size = len(json.dumps(movie_info, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            if movie_id in self._entries:
+                self._remove(movie_id)
+            self._entries[movie_id] = (self.clock() + self.ttl.total_seconds(), movie_info, size)
+            self._size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, movie_id):
+        """Must be called with the lock held"""
+        self._size -= self._entries.pop(movie_id)[2]
+
+    def __contains__(self, movie_id):
+        with self._lock:
+            entry = self._entries.get(movie_id)
+            return entry is not None and entry[0] > self.clock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+default_movie_cache = MovieCache()
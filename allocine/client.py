@@ -1,20 +1,21 @@
-from datetime import timedelta
+import threading
+from concurrent.futures import Future
+from typing import List
 
 import backoff
-import jmespath
-import requests
 
-from data.cinemas import Cinema
-from data.movies import MovieVersion
-from data.showtimes import Showtime
-from helpers.cleaners import clean_synopsis, str_datetime_to_datetime_obj
-from .constants import BASE_URL, PARTNER_KEY
+from .cache import canonical_url
+from .constants import PARTNER_KEY
+from .ratelimit import AdaptiveRateLimiter
+from .transport import RequestsTransport
 
 # === Client to execute requests with Allociné APIs ===
 class SingletonMeta(type):
     _instance = None
 
-    def __call__(self, *args, **kwargs):
+    def __call__(self, *args, shared: bool = True, **kwargs):
+        if not shared:  # An isolated instance, not the singleton
+            return super().__call__(*args, **kwargs)
         if self._instance is None:
             self._instance = super().__call__(*args, **kwargs)
         return self._instance
@@ -26,22 +27,97 @@ class Error503(Exception):
 
 class Client(metaclass=SingletonMeta):
     """Client to process the requests with allocine APIs.
-    This is a singleton to avoid the creation of a new session for every theater.
+    This is a singleton to avoid the creation of a new session for every theater
+    (use Client(..., shared=False) for an isolated client).
+    The requests go through `transport` (by default a RequestsTransport, with a
+    pool of keep-alive connections and timeouts), which can be used from several threads.
+    They are paced by `rate_limiter`, which slows down when the API answers 503.
+
+    Concurrent calls for the same url (whatever the order of its parameters)
+    share a single request, and all of them get its result or its error.
     """
 
-    def __init__(self, base_url):
+    def __init__(
+        self,
+        base_url,
+        cache=None,
+        transport=None,
+        rate_limiter=None,
+        in_flight=None,
+        in_flight_lock=None,
+    ):
         self.base_url = base_url
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; \
-                                   Intel Mac OS X 10.14; rv:63.0) \
-                                   Gecko/20100101 Firefox/63.0",
-        }
-        self.session = requests.session()
-        self.session.headers.update(headers)
+        self.cache = cache  # Optional ResponseCache
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        )
+        self.requests = 0  # Requests made (without the retries after a 503)
+        self.coalesced = 0  # Calls that waited for the request of another call
+        # canonical url -> Future of its payload (can be shared with other clients)
+        self._in_flight = in_flight if in_flight is not None else {}
+        self._in_flight_lock = in_flight_lock if in_flight_lock is not None else threading.Lock()
 
-    @backoff.on_exception(backoff.expo, Error503, max_tries=5, max_time=30)
     def _get(self, url: str, expected_status: int = 200, *args, **kwargs):
-        ret = self.session.get(url, *args, **kwargs)
+        if self.cache is not None:
+            payload = self.cache.get(url)
+            if payload is not None:
+                return payload
+
+        key = canonical_url(url)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.requests += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()  # Raises the error of the shared request
+
+        try:
+            payload = self._fetch(url, expected_status, *args, **kwargs)
+            if self.cache is not None:
+                self.cache.set(url, payload)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(payload)
+            return payload
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "coalesced": self.coalesced}
+
+    def with_cache(self, cache):
+        """Isolated client using the response `cache`, which shares the transport
+        (and its connection pool), the rate limiter and the requests in flight of
+        this one (so concurrent calls are still coalesced)"""
+        return Client(
+            self.base_url,
+            cache=cache,
+            transport=self.transport,
+            rate_limiter=self.rate_limiter,
+            in_flight=self._in_flight,
+            in_flight_lock=self._in_flight_lock,
+            shared=False,
+        )
+
+    @backoff.on_exception(backoff.expo, Error503, max_tries=5, max_time=30)
+    def _fetch(self, url: str, expected_status: int = 200, *args, **kwargs):
+        self.rate_limiter.acquire()
+        ret = None
+        try:
+            ret = self.transport.get(url, *args, **kwargs)
+        finally:
+            self.rate_limiter.release(
+                throttled=ret is not None and ret.status_code == 503,
+                succeeded=ret is not None and ret.status_code == expected_status,
+            )
         if ret.status_code != expected_status:
             if ret.status_code == 503:
                 raise Error503
@@ -61,6 +137,14 @@ class Client(metaclass=SingletonMeta):
         )
         return self._get(url=url)
 
+    def get_showtimelist_by_cinema_ids(
+        self, allocine_cinema_ids: List[str], page: int = 1, count: int = 10
+    ):
+        """Same as get_showtimelist_by_cinema_id, for several theaters at once"""
+        return self.get_showtimelist_by_cinema_id(
+            allocine_cinema_id=",".join(allocine_cinema_ids), page=page, count=count
+        )
+
     def get_cinema_info_by_id(self, allocine_cinema_id: str):
         url = f"{self.base_url}/theater?partner={PARTNER_KEY}&format=json&code={allocine_cinema_id}"
         return self._get(url=url)
@@ -2,6 +2,24 @@ __author__ = """Thibault Ducret"""
 __email__ = "hello@tducret.com"
 __version__ = "0.0.12"
 
+import os
+from datetime import timedelta
+
 DEFAULT_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
-BASE_URL = "http://api.allocine.fr/rest/v3"
+# ALLOCINE_BASE_URL : another host serving the API (ex: python -m benchmarks.fake_api)
+BASE_URL = os.environ.get("ALLOCINE_BASE_URL", "http://api.allocine.fr/rest/v3")
 PARTNER_KEY = "000042532791"
+DEFAULT_MAX_CONCURRENCY = 8  # Maximum number of simultaneous requests to the API
+DEFAULT_PAGE_SIZE = 10  # Number of theaters per showtimelist page
+MAX_THEATERS_PER_REQUEST = 50  # Keeps the url of the batched showtimelist short
+DEFAULT_LOOKAHEAD = 2  # Number of pages fetched in advance by Allocine.iter_cinemas
+DEFAULT_POOL_SIZE = 16  # Keep-alive connections of the Client (at least DEFAULT_MAX_CONCURRENCY)
+DEFAULT_CONNECT_TIMEOUT = 5  # In seconds
+DEFAULT_READ_TIMEOUT = 30  # In seconds
+DEFAULT_MAX_RATE = 50  # Requests per second once paced (they are not, until the API answers 503)
+# RefreshScheduler : time to live of the cinemas, refreshed ahead of their expiry
+DEFAULT_REFRESH_TTL = timedelta(minutes=30)
+DEFAULT_REFRESH_AHEAD = timedelta(minutes=5)
+DEFAULT_REFRESH_CONCURRENCY = 2  # Simultaneous background refreshes
+DEFAULT_REFRESH_BUDGET = 120  # Background refreshes per hour
+DEFAULT_REFRESH_MAX_ENTRIES = 1000  # Cinemas kept by the scheduler
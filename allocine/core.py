@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+
+"""Synchronous Allociné API."""
+
+import itertools
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import List, Optional
+
+from allocine.cache import default_movie_cache
+from allocine.client import Client
+from allocine.decoder import (
+    MovieShowtimesRecord,
+    ShowtimeListRecord,
+    TheaterShowtimesRecord,
+    decode_movie_info,
+    decode_showtimelist,
+    decode_theater_info,
+)
+from data.cinemas import Cinema, LazyCinema
+from data.movies import LazyMovieVersion, MovieVersion
+from data.showtimes import Showtime
+from helpers.cleaners import clean_synopsis, day_hours_to_minutes
+from .constants import (
+    BASE_URL,
+    DEFAULT_LOOKAHEAD,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PAGE_SIZE,
+    MAX_THEATERS_PER_REQUEST,
+)
+
+# === Main class ===
+class Allocine:
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        client=None,
+        cache=None,
+        movie_cache=None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        lazy_details: bool = False,
+        prefetch_member_cards: bool = False,
+    ):
+        """With `lazy_details`, the movie details (synopsis, directors...) and the
+        member cards of the cinemas are only requested when first accessed.
+        With `prefetch_member_cards` too, the member cards of a page are requested
+        concurrently with the page (when they are needed for every cinema)."""
+        self.__client = client if client is not None else Client(base_url=base_url)
+        if cache is not None:
+            # Only this instance uses the cache, not the other users of the client
+            self.__client = self.__client.with_cache(cache)
+        self.max_concurrency = max_concurrency
+        self.page_size = page_size  # Number of theaters per showtimelist page
+        self.lazy_details = lazy_details
+        self.prefetch_member_cards = prefetch_member_cards
+        # Movie info shared by the instances of the process (avoids useless requests)
+        self.__movie_store = (
+            movie_cache if movie_cache is not None else default_movie_cache
+        )
+
+    def get_cinema(self, allocine_cinema_id: str):
+        showtimelist = decode_showtimelist(
+            self.__client.get_showtimelist_by_cinema_id(
+                allocine_cinema_id=allocine_cinema_id
+            )
+        )
+        if showtimelist.total_results == 0:
+            raise ValueError(
+                f"Cinema not found. Is allocine_cinema_id {allocine_cinema_id!r} correct?"
+            )
+
+        cinemas = self.__get_cinemas_from_showtimelists(showtimelists=[showtimelist])
+        if len(cinemas) != 1:
+            raise ValueError("Expecting 1 cinema but received {}".format(len(cinemas)))
+
+        return cinemas[0]
+
+    def get_cinemas(self, allocine_cinema_ids: List[str]):
+        """Returns the cinemas of `allocine_cinema_ids` (in the same order),
+        requesting several theaters per showtimelist page.
+        """
+        allocine_cinema_ids = list(dict.fromkeys(allocine_cinema_ids))  # Distinct
+        pages = []
+        for i in range(0, len(allocine_cinema_ids), MAX_THEATERS_PER_REQUEST):
+            pages += self.__get_all_pages(
+                partial(
+                    self.__client.get_showtimelist_by_cinema_ids,
+                    allocine_cinema_ids=allocine_cinema_ids[i:i + MAX_THEATERS_PER_REQUEST],
+                )
+            )
+        cinemas_per_id = {
+            cinema.allocine_id: cinema
+            for cinema in self.__get_cinemas_from_showtimelists(
+                showtimelists=pages, distance_max_inclusive=None
+            )
+        }
+
+        missing_ids = [i for i in allocine_cinema_ids if i not in cinemas_per_id]
+        if missing_ids:
+            raise ValueError(
+                f"Cinema not found. Is allocine_cinema_id {missing_ids[0]!r} correct?"
+            )
+        return [cinemas_per_id[i] for i in allocine_cinema_ids]
+
+    def __get_cinemas_from_showtimelists(
+        self, showtimelists: List[ShowtimeListRecord], distance_max_inclusive: Optional[int] = 0
+    ):
+        """Build the cinemas of showtimelist pages (once per allocine_id).
+        With `distance_max_inclusive=None`, the cinemas are kept whatever their distance.
+        """
+        theater_showtimes = []
+        codes = set()
+        for showtimelist in showtimelists:
+            for record in showtimelist.theater_showtimes:
+                theater = record.theater
+                if theater.distance is not None and distance_max_inclusive is not None:
+                    # distance is not present when theater ids were used for search
+                    if theater.distance > distance_max_inclusive:
+                        # Skip cinemas that are above the max distance specified
+                        continue
+                if theater.code in codes:
+                    # The pages may overlap if the results changed while paginating
+                    continue
+                codes.add(theater.code)
+                theater_showtimes.append(record)
+
+        movie_details = {}  # movie_id -> details, each movie info is decoded once
+        if self.lazy_details and self.prefetch_member_cards:
+            member_cards = self.__call_concurrently(
+                [(self.__get_member_cards, record.theater.code) for record in theater_showtimes]
+            )
+            return [
+                Cinema(member_cards=cards, **self.__get_cinema_fields(record, movie_details))
+                for record, cards in zip(theater_showtimes, member_cards)
+            ]
+        if self.lazy_details:
+            return [
+                LazyCinema(
+                    load_member_cards=partial(self.__get_member_cards, record.theater.code),
+                    **self.__get_cinema_fields(record, movie_details),
+                )
+                for record in theater_showtimes
+            ]
+
+        # 1st phase : fetch the theater info and the missing movie info of the pages
+        movie_ids = [
+            movie_showtimes.movie_id
+            for record in theater_showtimes
+            for movie_showtimes in record.movie_showtimes
+        ]
+        cinema_codes = [record.theater.code for record in theater_showtimes]
+        raw_cinema_infos = self.__prefetch(cinema_codes=cinema_codes, movie_ids=movie_ids)
+
+        # 2nd phase : build the objects, without any request
+        return [
+            Cinema(
+                member_cards=decode_theater_info(raw_cinema_info).member_cards,
+                **self.__get_cinema_fields(record, movie_details),
+            )
+            for record, raw_cinema_info in zip(theater_showtimes, raw_cinema_infos)
+        ]
+
+    def __get_cinema_fields(self, record: TheaterShowtimesRecord, movie_details: dict) -> dict:
+        theater = record.theater
+        return dict(
+            allocine_id=theater.code,
+            name=theater.name,
+            address=theater.address,
+            zipcode=theater.postal_code,
+            city=theater.city,
+            showtimes=self.__parse_showtimes(record.movie_showtimes, movie_details),
+        )
+
+    def __get_member_cards(self, allocine_cinema_id: str):
+        return decode_theater_info(
+            self.__client.get_cinema_info_by_id(allocine_cinema_id)
+        ).member_cards
+
+    def __prefetch(self, cinema_codes: list, movie_ids: list):
+        """Fetch the theater info of `cinema_codes` and the movie info of `movie_ids`
+        (only the ones that are not already in the store) through a bounded thread pool.
+        Returns the theater info, in the `cinema_codes` order.
+        """
+        missing_movie_ids = [
+            movie_id
+            for movie_id in dict.fromkeys(movie_ids)  # Distinct, in order
+            if movie_id not in self.__movie_store
+        ]
+        calls = [(self.__client.get_cinema_info_by_id, code) for code in cinema_codes]
+        calls += [(self.get_movie_info, movie_id) for movie_id in missing_movie_ids]
+        return self.__call_concurrently(calls)[:len(cinema_codes)]
+
+    def __call_concurrently(self, calls: list):
+        """Returns [func(arg) for func, arg in calls],
+        with the calls made through a bounded thread pool.
+        """
+        if len(calls) <= 1 or self.max_concurrency <= 1:
+            return [func(arg) for func, arg in calls]
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = [executor.submit(func, arg) for func, arg in calls]
+            return [future.result() for future in futures]  # Raise the first error
+
+    def __get_all_pages(self, get_page):
+        """Fetch and decode the 1st page, then every other page (according to
+        feed.totalResults) concurrently. `get_page` is called with the `page` and
+        `count` arguments.
+        """
+        def get_page_number(page: int):
+            return decode_showtimelist(get_page(page=page, count=self.page_size))
+
+        first_page = get_page_number(1)
+        last_page = math.ceil(first_page.total_results / self.page_size)
+        other_pages = self.__call_concurrently(
+            [(get_page_number, page) for page in range(2, last_page + 1)]
+        )
+        return [first_page] + other_pages
+
+    def __get_geocode_pages(self, geocode: int):
+        pages = self.__get_all_pages(
+            partial(self.__client.get_showtimelist_from_geocode, geocode=geocode)
+        )
+        if pages[0].total_results == 0:
+            raise ValueError(f"Theater not found. Is geocode {geocode!r} correct?")
+        return pages
+
+    def get_cinema_ids(self, geocode: int):
+        codes = []
+        for showtimelist in self.__get_geocode_pages(geocode=geocode):
+            for record in showtimelist.theater_showtimes:
+                code = record.theater.code
+                name = record.theater.name
+                if code in codes:
+                    continue
+                print(f"{code} - {name}")
+                codes.append(code)
+
+        return codes
+
+    def get_cinemas_from_geocode(self, geocode: int):
+        """Returns the cinemas of `get_cinema_ids`, built from the geocode pages
+        (which already contain the showtimes), without one more request per cinema.
+        """
+        return self.__get_cinemas_from_showtimelists(
+            showtimelists=self.__get_geocode_pages(geocode=geocode),
+            distance_max_inclusive=None,
+        )
+
+    def search_cinemas(self, geocode: int):
+        return self.__get_cinemas_from_showtimelists(
+            showtimelists=self.__get_geocode_pages(geocode=geocode),
+            distance_max_inclusive=0,
+        )
+
+    def iter_cinemas(
+        self,
+        geocode: int,
+        distance_max_inclusive: Optional[int] = None,
+        lookahead: int = DEFAULT_LOOKAHEAD,
+    ):
+        """Yields the cinemas of a geocode as soon as their page is parsed.
+        While the caller processes a page, the next `lookahead` pages
+        (and their theater and movie info) are fetched in the background.
+        """
+        get_page = partial(
+            self.__client.get_showtimelist_from_geocode,
+            geocode=geocode,
+            count=self.page_size,
+        )
+        first_page = decode_showtimelist(get_page(page=1))
+        if first_page.total_results == 0:
+            raise ValueError(f"Theater not found. Is geocode {geocode!r} correct?")
+        last_page = math.ceil(first_page.total_results / self.page_size)
+
+        def get_cinemas_of_page(page: int):
+            showtimelist = first_page if page == 1 else decode_showtimelist(get_page(page=page))
+            return self.__get_cinemas_from_showtimelists(
+                showtimelists=[showtimelist],
+                distance_max_inclusive=distance_max_inclusive,
+            )
+
+        executor = ThreadPoolExecutor(max_workers=max(1, lookahead))
+        pages = iter(range(1, last_page + 1))
+        futures = deque(
+            executor.submit(get_cinemas_of_page, page)
+            for page in itertools.islice(pages, max(1, lookahead))
+        )
+        codes = set()
+        try:
+            while futures:
+                cinemas = futures.popleft().result()
+                for page in itertools.islice(pages, 1):  # Keep the lookahead full
+                    futures.append(executor.submit(get_cinemas_of_page, page))
+                for cinema in cinemas:
+                    if cinema.allocine_id not in codes:
+                        codes.add(cinema.allocine_id)
+                        yield cinema
+        finally:
+            for future in futures:  # The caller may stop before the last cinema
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def __parse_showtimes(self, movie_showtimes: List[MovieShowtimesRecord], movie_details: dict):
+        """Build the showtimes. The movie info must have been prefetched
+        (unless the details are lazy). `movie_details` keeps the decoded details."""
+        showtimes = []
+        for s in movie_showtimes:
+            duration_obj = timedelta(seconds=s.runtime) if s.runtime else None
+            feed_fields = dict(
+                movie_id=s.movie_id,
+                title=s.title,
+                rating=s.rating,
+                language=s.language,
+                screen_format=s.screen_format,
+                duration=duration_obj,
+                poster=s.poster,
+            )
+            if self.lazy_details:
+                movie = LazyMovieVersion(
+                    load_details=partial(self.__get_movie_details, s.movie_id, movie_details),
+                    **feed_fields,
+                )
+            else:
+                movie = MovieVersion(
+                    **feed_fields, **self.__get_movie_details(s.movie_id, movie_details)
+                )
+            # The end is 15 minutes after the movie (ads and trailers)
+            end_offset = (s.runtime + 900) // 60 if s.runtime else None
+            for day, hours in s.days:
+                for start_minute in day_hours_to_minutes(day, hours):
+                    showtime = Showtime.from_minutes(
+                        start_minute,
+                        start_minute + end_offset if end_offset is not None else None,
+                        movie,
+                    )
+                    showtimes.append(showtime)
+        return showtimes
+
+    def __get_movie_details(self, movie_id: int, movie_details: dict) -> dict:
+        """The DETAIL_FIELDS of a MovieVersion, decoded once per `movie_details`"""
+        details = movie_details.get(movie_id)
+        if details is None:
+            details = movie_details[movie_id] = self.__decode_movie_details(movie_id)
+        return details
+
+    def __decode_movie_details(self, movie_id: int) -> dict:
+        movie_info = decode_movie_info(self.get_movie_info(movie_id))
+        return dict(
+            synopsis=clean_synopsis(movie_info.synopsis),
+            original_title=movie_info.original_title,
+            year=movie_info.year,
+            countries=movie_info.countries,
+            genres=", ".join(movie_info.genres),
+            directors=movie_info.directors,
+            actors=movie_info.actors,
+        )
+
+    def get_movie_info(self, movie_id: int):
+        movie_info = self.__movie_store.get(movie_id)
+        if movie_info is None:
+            movie_info = self.__client.get_movie_info_by_id(movie_id).get("movie")
+            self.__movie_store.set(movie_id, movie_info)
+        return movie_info
+
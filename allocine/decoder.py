@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""Decoding of the raw Allociné payloads into typed records.
+
+The accessors are hand-written (plain `dict.get` chains), instead of jmespath
+expressions parsed again for every theater and every movie showtime.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class TheaterRecord:
+    code: str
+    name: str
+    address: str
+    postal_code: str
+    city: str
+    distance: Optional[float]
+
+
+@dataclass
+class MovieShowtimesRecord:
+    movie_id: int
+    title: str
+    runtime: Optional[int]  # In seconds
+    rating: Optional[float]
+    poster: Optional[str]
+    language: Optional[str]
+    screen_format: Optional[str]
+    days: List[Tuple[str, List[str]]]  # ex: [("2020-03-04", ["14:00", "20:30"])]
+
+
+@dataclass
+class TheaterShowtimesRecord:
+    theater: TheaterRecord
+    movie_showtimes: List[MovieShowtimesRecord]
+
+
+@dataclass
+class ShowtimeListRecord:
+    total_results: int
+    theater_showtimes: List[TheaterShowtimesRecord]
+
+
+@dataclass
+class MovieInfoRecord:
+    original_title: Optional[str]
+    year: Optional[int]
+    synopsis: Optional[str]
+    countries: Optional[List[str]]
+    genres: List[str]
+    directors: Optional[str]
+    actors: Optional[str]
+
+
+@dataclass
+class TheaterInfoRecord:
+    member_cards: Optional[List[dict]]
+
+
+# === Accessors ===
+def _get_dict(obj, key) -> dict:
+    value = obj.get(key) if obj else None
+    return value if isinstance(value, dict) else {}
+
+
+def _get_text(obj, key) -> Optional[str]:
+    """> _get_text({"version": {"$": "Français"}}, "version")
+    'Français'
+    """
+    value = obj.get(key) if obj else None
+    return value.get("$") if isinstance(value, dict) else None
+
+
+def _get_texts(obj, key) -> Optional[List[str]]:
+    """Same as the jmespath expression 'key[]."$"'
+    > _get_texts({"genre": [{"$": "Drame"}, {"$": "Comédie"}]}, "genre")
+    ['Drame', 'Comédie']
+    """
+    values = obj.get(key) if obj else None
+    if not isinstance(values, list):
+        return None
+    return [
+        value["$"] for value in values if isinstance(value, dict) and value.get("$") is not None
+    ]
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """The languages, screen formats and cities are repeated a lot in a region,
+    they are stored only once in memory."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+# === Decoders ===
+def decode_theater(raw_theater: dict) -> TheaterRecord:
+    return TheaterRecord(
+        code=raw_theater.get("code"),
+        name=raw_theater.get("name"),
+        address=raw_theater.get("address"),
+        postal_code=raw_theater.get("postalCode"),
+        city=_intern(raw_theater.get("city")),
+        distance=raw_theater.get("distance"),
+    )
+
+
+def decode_movie_showtimes(raw_movie_showtimes: dict) -> MovieShowtimesRecord:
+    raw_movie = _get_dict(_get_dict(raw_movie_showtimes, "onShow"), "movie")
+    days = []
+    for showtimes_of_day in raw_movie_showtimes.get("scr") or []:
+        if showtimes_of_day is None:
+            continue
+        times = showtimes_of_day.get("t")
+        if times is None:
+            # Sometimes films have no set time on a given date.
+            continue
+        days.append((showtimes_of_day.get("d"), [t.get("$") for t in times]))
+
+    return MovieShowtimesRecord(
+        movie_id=raw_movie.get("code"),
+        title=raw_movie.get("title"),
+        runtime=raw_movie.get("runtime"),
+        rating=_to_float(_get_dict(raw_movie, "statistics").get("userRating")),
+        poster=_get_dict(raw_movie, "poster").get("href"),
+        language=_intern(_get_text(raw_movie_showtimes, "version")),
+        screen_format=_intern(_get_text(raw_movie_showtimes, "screenFormat")),
+        days=days,
+    )
+
+
+def decode_theater_showtimes(raw_theater_showtimes: dict) -> TheaterShowtimesRecord:
+    return TheaterShowtimesRecord(
+        theater=decode_theater(_get_dict(_get_dict(raw_theater_showtimes, "place"), "theater")),
+        movie_showtimes=[
+            decode_movie_showtimes(s)
+            for s in raw_theater_showtimes.get("movieShowtimes") or []
+        ],
+    )
+
+
+def decode_showtimelist(raw_showtimelist: dict) -> ShowtimeListRecord:
+    """Decode a /showtimelist payload"""
+    feed = _get_dict(raw_showtimelist, "feed")
+    return ShowtimeListRecord(
+        total_results=feed.get("totalResults") or 0,
+        theater_showtimes=[
+            decode_theater_showtimes(t) for t in feed.get("theaterShowtimes") or []
+        ],
+    )
+
+
+def decode_movie_info(movie_info: dict) -> MovieInfoRecord:
+    """Decode the "movie" part of a /movie payload"""
+    movie_info = movie_info or {}
+    year = movie_info.get("productionYear")
+    casting = _get_dict(movie_info, "castingShort")
+    return MovieInfoRecord(
+        original_title=movie_info.get("originalTitle"),
+        year=int(year) if year else None,
+        synopsis=movie_info.get("synopsis"),
+        countries=_get_texts(movie_info, "nationality"),
+        genres=_get_texts(movie_info, "genre") or [],
+        directors=casting.get("directors"),
+        actors=casting.get("actors"),
+    )
+
+
+def decode_theater_info(raw_theater_info: dict) -> TheaterInfoRecord:
+    """Decode a /theater payload"""
+    return TheaterInfoRecord(
+        member_cards=_get_dict(raw_theater_info, "theater").get("memberCard"),
+    )
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""Client-side rate limiting of the requests to the Allociné API.
+
+At most `concurrency` requests are in flight. They are not paced otherwise,
+until the API answers with a 503 : the requests then take a token from a bucket
+refilled at `rate` tokens per second. Both limits adapt (AIMD) : they are
+halved by a 503, and increase additively with the successful requests (the rate
+by `rate_increase` * `max_rate` per window of `rate` successes, up to `max_rate`).
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .constants import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RATE
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with an adaptive rate and concurrency, shared by the threads
+    of a Client. Each request is surrounded by `acquire()` and `release()`."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,  # None : not paced until a 503
+        max_rate: float = DEFAULT_MAX_RATE,
+        min_rate: float = 0.5,
+        concurrency: float = DEFAULT_MAX_CONCURRENCY,
+        max_concurrency: float = 4 * DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: float = 1,
+        rate_increase: float = 0.05,  # Proportion of max_rate added per window of successes
+        decrease_factor: float = 0.5,
+        decrease_interval: float = 1.0,  # The 503s of a storm only decrease once
+        clock=time.monotonic,
+    ):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = max(1.0, rate or 0)  # Tokens that can be saved while idle
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.rate_increase = rate_increase
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.clock = clock
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0  # Number of 503 received
+        self.decreases = 0  # Number of times the limits were decreased
+        self.waits = 0  # Number of requests that had to wait
+        self.wait_time = 0.0  # Total waiting time, in seconds
+        self._tokens = self.burst
+        self._refilled_at = clock()
+        self._decreased_at = None
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        if self.rate is None:
+            self._tokens = self.burst
+        else:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self):
+        """Waits for a token and for a free slot"""
+        with self._condition:
+            started_at = self.clock()
+            waited = False
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if self.in_flight < max(1, int(self.concurrency)) and self._tokens >= 1:
+                    break
+                waited = True
+                if self.in_flight >= max(1, int(self.concurrency)):
+                    self._condition.wait()  # Until a release
+                else:
+                    self._condition.wait((1 - self._tokens) / self.rate)
+            self._tokens -= 1
+            self.in_flight += 1
+            self.requests += 1
+            if waited:
+                self.waits += 1
+                self.wait_time += self.clock() - started_at
+
+    def release(self, throttled: bool = False, succeeded: bool = True):
+        """Frees the slot of a request. A throttled one (503) decreases the limits
+        (and starts the pacing), a successful one increases them"""
+        with self._condition:
+            self.in_flight -= 1
+            now = self.clock()
+            if throttled:
+                self.throttled += 1
+                if self._decreased_at is None or now - self._decreased_at >= self.decrease_interval:
+                    self._decreased_at = now
+                    self.decreases += 1
+                    self._refill(now)
+                    self.rate = max(
+                        self.min_rate, (self.rate or self.max_rate) * self.decrease_factor
+                    )
+                    self.concurrency = max(
+                        self.min_concurrency, self.concurrency * self.decrease_factor
+                    )
+                    self._tokens = min(self._tokens, 1.0)  # No burst right after a 503
+            elif succeeded:
+                self._refill(now)
+                if self.rate is not None:  # Once paced, stays paced
+                    self.rate = min(
+                        self.max_rate,
+                        self.rate + self.rate_increase * self.max_rate / self.rate,
+                    )
+                # +1 request in flight once the current window has succeeded
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1 / self.concurrency
+                )
+            self.burst = max(1.0, self.rate or 0)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "rate": self.rate,  # None : not paced yet
+                "concurrency": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "decreases": self.decreases,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+            }
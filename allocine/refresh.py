@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""Stale-while-revalidate refresh of the most requested cinemas.
+
+    scheduler = RefreshScheduler(Allocine().get_cinema)
+    scheduler.start()
+    cinema = scheduler.get("P0645")  # Never waits for a refresh, once loaded
+
+The scheduler counts the accesses per allocine_cinema_id. A stale cinema is
+returned immediately while it is refreshed in the background, and the hottest
+cinemas are refreshed ahead of their expiry, within a concurrency limit and
+a refresh budget. At most `max_entries` cinemas are kept : the expired ones,
+then the least accessed ones, are evicted first. Once the scheduler is stopped,
+a stale cinema is fetched again synchronously.
+
+If the Allocine instance uses a ResponseCache, its "showtimelist" time to live
+should not be longer than `ttl`, or the refreshes would get the cached pages.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from .constants import (
+    DEFAULT_REFRESH_AHEAD,
+    DEFAULT_REFRESH_BUDGET,
+    DEFAULT_REFRESH_CONCURRENCY,
+    DEFAULT_REFRESH_MAX_ENTRIES,
+    DEFAULT_REFRESH_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshEntry:
+    value: Any
+    expires_at: float
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        ttl: timedelta = DEFAULT_REFRESH_TTL,
+        refresh_ahead: timedelta = DEFAULT_REFRESH_AHEAD,
+        max_concurrency: int = DEFAULT_REFRESH_CONCURRENCY,
+        budget: int = DEFAULT_REFRESH_BUDGET,
+        budget_period: timedelta = timedelta(hours=1),
+        max_hot: int = 50,
+        max_entries: int = DEFAULT_REFRESH_MAX_ENTRIES,
+        clock=time.monotonic,
+    ):
+        """
+        fetch : returns the value (ex: the Cinema) of an allocine_cinema_id
+        refresh_ahead : the hot entries are refreshed when they expire within this delay
+        max_concurrency : maximum number of refreshes running at the same time
+        budget : maximum number of background refreshes per `budget_period`
+        max_hot : number of most accessed ids refreshed ahead of their expiry
+        max_entries : maximum number of values kept
+        """
+        self.fetch = fetch
+        self.ttl = ttl.total_seconds()
+        self.refresh_ahead = refresh_ahead.total_seconds()
+        self.max_concurrency = max_concurrency
+        self.budget = budget
+        self.budget_period = budget_period.total_seconds()
+        self.max_hot = max_hot
+        self.max_entries = max_entries
+        self.clock = clock
+        self.accesses = Counter()  # allocine_cinema_id -> (decayed) number of accesses
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped = 0  # Refreshes not started because of the limits
+        self.evictions = 0
+        self._entries: Dict[str, RefreshEntry] = {}
+        self._in_flight = set()
+        self._refresh_times = deque()  # Start times of the refreshes of the budget period
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="refresh"
+        )
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def get(self, allocine_cinema_id: str):
+        """Returns the value of `allocine_cinema_id`. Only the first access waits
+        for `fetch` : a stale value is returned as is, and refreshed in the background
+        (or fetched again right away, once the scheduler is stopped)."""
+        with self._lock:
+            self.accesses[allocine_cinema_id] += 1
+            entry = self._entries.get(allocine_cinema_id)
+            if entry is not None and entry.expires_at > self.clock():
+                self.hits += 1
+                return entry.value
+            serve_stale = entry is not None and not self._stopped.is_set()
+            if serve_stale:
+                self.stale_hits += 1
+                scheduled = self._schedule(allocine_cinema_id)
+            else:
+                self.misses += 1
+        if serve_stale:
+            if scheduled:
+                self._submit(allocine_cinema_id)
+            return entry.value
+
+        try:
+            value = self.fetch(allocine_cinema_id)
+        except Exception:
+            if entry is None:
+                raise
+            logger.exception(f"Fetch of {allocine_cinema_id!r} failed, the stale value is kept")
+            with self._lock:
+                self.failures += 1
+            return entry.value
+        self._store(allocine_cinema_id, value)
+        return value
+
+    def _store(self, allocine_cinema_id: str, value):
+        with self._lock:
+            self._entries[allocine_cinema_id] = RefreshEntry(
+                value=value, expires_at=self.clock() + self.ttl
+            )
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Removes the expired entries, then the least accessed ones, down to
+        `max_entries`. Must be called with the lock held."""
+        now = self.clock()
+        evicted = [code for code, entry in self._entries.items() if entry.expires_at <= now]
+        excess = len(self._entries) - len(evicted) - self.max_entries
+        if excess > 0:
+            evicted += heapq.nsmallest(
+                excess,
+                (code for code, entry in self._entries.items() if entry.expires_at > now),
+                key=lambda code: (self.accesses[code], self._entries[code].expires_at),
+            )
+        for code in evicted:
+            del self._entries[code]
+            self.accesses.pop(code, None)
+        self.evictions += len(evicted)
+
+    def _schedule(self, allocine_cinema_id: str) -> bool:
+        """Reserves the refresh of `allocine_cinema_id` if the limits allow it,
+        `_submit` must then be called without the lock. Must be called with the lock held."""
+        if allocine_cinema_id in self._in_flight or self._stopped.is_set():
+            return False
+        now = self.clock()
+        while self._refresh_times and self._refresh_times[0] <= now - self.budget_period:
+            self._refresh_times.popleft()
+        if len(self._in_flight) >= self.max_concurrency or len(self._refresh_times) >= self.budget:
+            self.skipped += 1
+            return False
+        self._in_flight.add(allocine_cinema_id)
+        self._refresh_times.append(now)
+        return True
+
+    def _submit(self, allocine_cinema_id: str):
+        try:
+            self._executor.submit(self._refresh, allocine_cinema_id)
+        except RuntimeError:  # Stopped meanwhile : the stale value is kept
+            with self._lock:
+                self._in_flight.discard(allocine_cinema_id)
+
+    def _refresh(self, allocine_cinema_id: str):
+        try:
+            value = self.fetch(allocine_cinema_id)
+        except Exception:
+            logger.exception(f"Refresh of {allocine_cinema_id!r} failed, the stale value is kept")
+            with self._lock:
+                self.failures += 1
+        else:
+            self._store(allocine_cinema_id, value)
+            with self._lock:
+                self.refreshes += 1
+        finally:
+            with self._lock:
+                self._in_flight.discard(allocine_cinema_id)
+
+    def hottest(self) -> List[str]:
+        """The `max_hot` most accessed ids"""
+        with self._lock:
+            return [code for code, _ in self.accesses.most_common(self.max_hot)]
+
+    def tick(self) -> List[str]:
+        """Refreshes the hottest entries that expire within `refresh_ahead`
+        (hottest first, within the limits), and halves the access counts so that
+        the ranking follows the recent traffic. Returns the refreshed ids."""
+        with self._lock:
+            deadline = self.clock() + self.refresh_ahead
+            hottest = [code for code, _ in self.accesses.most_common(self.max_hot)]
+            scheduled = [
+                code
+                for code in hottest
+                if code in self._entries
+                and self._entries[code].expires_at <= deadline
+                and self._schedule(code)
+            ]
+            for code in list(self.accesses):
+                self.accesses[code] //= 2
+                if not self.accesses[code]:
+                    del self.accesses[code]
+        for code in scheduled:
+            self._submit(code)
+        return scheduled
+
+    def start(self, interval: float = 60):
+        """Calls `tick` every `interval` seconds, in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="refresh-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, interval: float):
+        while not self._stopped.wait(interval):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Refresh tick failed")
+
+    def stop(self, wait: bool = False):
+        self._stopped.set()
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "evictions": self.evictions,
+                "in_flight": len(self._in_flight),
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""Record and replay of the Allociné API responses, to work offline.
+
+    store = FixtureStore("fixtures")
+    # Records the responses of the real API...
+    client = Client(BASE_URL, transport=RecordingTransport(RequestsTransport(), store), shared=False)
+    # ... and replays them, without any network
+    client = Client(BASE_URL, transport=ReplayTransport(store), shared=False)
+
+The fixtures are JSON files, one per response, named after the endpoint and the
+canonical query of the url (the host and the partner key are ignored, so the
+fixtures can be served by another host, like benchmarks.fake_api).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .cache import get_endpoint
+
+RECORDED_ENDPOINTS = ("showtimelist", "theater", "movie")
+
+
+class MissingFixture(LookupError):
+    pass
+
+
+class StoredResponse:
+    """Response read from a fixture, with the interface used by the Client"""
+
+    def __init__(self, status_code: int, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def fixture_key(url: str) -> str:
+    """> fixture_key("http://a.fr/rest/v3/movie?partner=1&format=json&code=2")
+    'movie?code=2&format=json'
+    """
+    query = [
+        (name, value)
+        for name, value in parse_qsl(urlsplit(url).query, keep_blank_values=True)
+        if name != "partner"
+    ]
+    return f"{get_endpoint(url)}?{urlencode(sorted(query))}"
+
+
+class FixtureStore:
+    """Directory of recorded responses : <directory>/<endpoint>/<hash of the key>.json
+    The files are read once, and the same instance can be used from several threads."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._responses = {}  # fixture key -> StoredResponse
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return self.directory / key.split("?", 1)[0] / f"{name}.json"
+
+    def get(self, url: str) -> Optional[StoredResponse]:
+        key = fixture_key(url)
+        with self._lock:
+            response = self._responses.get(key)
+        if response is None:
+            try:
+                with open(self.path(key), encoding="utf-8") as f:
+                    fixture = json.load(f)
+            except FileNotFoundError:
+                return None
+            response = StoredResponse(fixture["status"], fixture["payload"])
+            with self._lock:
+                self._responses[key] = response
+        return response
+
+    def save(self, url: str, status_code: int, payload):
+        key = fixture_key(url)
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {"url": key, "status": status_code, "payload": payload}
+        temporary_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+        os.replace(temporary_path, path)  # The readers never see a partial file
+        with self._lock:
+            self._responses[key] = StoredResponse(status_code, payload)
+
+    def __len__(self):
+        return sum(1 for _ in self.directory.glob("*/*.json"))
+
+
+class RecordingTransport:
+    """Forwards the requests to `transport`, and saves the responses of the
+    `endpoints` in `store` (the 503 are not saved, they are retried)"""
+
+    def __init__(self, transport, store: FixtureStore, endpoints=RECORDED_ENDPOINTS):
+        self.transport = transport
+        self.store = store
+        self.endpoints = endpoints
+
+    def get(self, url: str, **kwargs):
+        response = self.transport.get(url, **kwargs)
+        if response.status_code != 503 and get_endpoint(url) in self.endpoints:
+            try:
+                payload = response.json()
+            except ValueError:  # Not a JSON body
+                payload = None
+            self.store.save(url, response.status_code, payload)
+        return response
+
+
+class ReplayTransport:
+    """Serves the responses of `store`. An url that was not recorded raises MissingFixture"""
+
+    def __init__(self, store: FixtureStore):
+        self.store = store
+
+    def get(self, url: str, **kwargs) -> StoredResponse:
+        response = self.store.get(url)
+        if response is None:
+            raise MissingFixture(f"{url!r} was not recorded in {self.store.directory}")
+        return response
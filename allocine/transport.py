@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""HTTP transports of the Client.
+
+A transport only needs a `get(url)` method, returning an object with a
+`status_code` attribute and a `json()` method (like requests.Response), so that
+the Client can be given a fake transport in the tests.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_READ_TIMEOUT
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; \
+                                   Intel Mac OS X 10.14; rv:63.0) \
+                                   Gecko/20100101 Firefox/63.0"
+
+
+class RequestsTransport:
+    """requests based transport, which can be used from several threads.
+
+    Each thread gets its own session (the sessions are not thread-safe), but all
+    the sessions share the same adapter, so the same keep-alive connection pool
+    of `pool_size` connections per host. When they are all busy, the other
+    requests wait for a connection instead of opening new ones.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        headers: dict = None,
+    ):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.headers = dict({"User-Agent": USER_AGENT}, **(headers or {}))
+        self.adapter = HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """The session of the current thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
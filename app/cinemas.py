@@ -1,19 +1,20 @@
 import json
 
 from allocine import Allocine
-from app.formatting import dumper
+from app.formatting import Serializer, dumper
 
 
-def get_cinemas(format="json"):
-    allocine = Allocine()
+def get_cinemas(format="json", cache=None):
+    allocine = Allocine(cache=cache)
     # Get cinemas in Paris
-    codes = allocine.get_cinema_ids(83165)
-    print(codes)
-    result = [allocine.get_cinema(allocine_cinema_id=code) for code in codes]
+    cinemas = allocine.iter_cinemas(83165)
 
     if format == "json":
-        return json.dumps(result, default=dumper, indent=2)
-    return result
+        # Serialized one by one, so that the cinemas (and their showtimes)
+        # do not have to be kept in memory until the end
+        serializer = Serializer()
+        return b"".join(serializer.iter_array(cinemas, indent=True)).decode("utf-8")
+    return list(cinemas)
 
 
 if __name__ == "__main__":
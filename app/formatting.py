@@ -1,6 +1,142 @@
-def dumper(obj):
+"""JSON serialization of the data objects.
+
+The serializers are registered per type (see `register`), and a `Serializer`
+keeps the fragment of each movie and cinema, which is built only once even if
+the object appears in several days. Only the movies, shared by the cinemas, are
+kept from one document to the next. orjson is used when it is installed
+(pip install orjson), the json module otherwise.
+"""
+
+import json
+from typing import Callable, Dict, Optional, Tuple
+
+from data.aggregation import ShowtimeWithCinema
+from data.cinemas import Cinema
+from data.movies import MovieVersion
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+_serializers: Dict[type, Callable] = {}
+_memoized_types: Dict[type, bool] = {}  # Types whose fragments are kept -> across documents
+_resolved: Dict[type, Optional[Tuple[Callable, bool, bool]]] = {}  # Including the subclasses
+
+
+def register(cls: type, serializer: Callable, memoize: bool = False, shared: bool = False):
+    """Registers the function returning the JSON-compatible fragment of `cls`
+    (and of its subclasses). With `memoize`, the fragment of an object is built once
+    per document, or once per Serializer with `shared` (for the objects shared by
+    the documents : they are kept as long as the Serializer)."""
+    _serializers[cls] = serializer
+    if memoize or shared:
+        _memoized_types[cls] = shared
+    else:
+        _memoized_types.pop(cls, None)
+    _resolved.clear()
+
+
+def _find_serializer(cls: type) -> Optional[Tuple[Callable, bool, bool]]:
+    """(serializer, memoize, shared) of the closest registered base class of `cls`"""
+    if cls not in _resolved:
+        base = next((base for base in cls.__mro__ if base in _serializers), None)
+        _resolved[cls] = (
+            (_serializers[base], base in _memoized_types, _memoized_types.get(base, False))
+            if base is not None
+            else None
+        )
+    return _resolved[cls]
+
+
+def _fallback(obj):
+    """The former behaviour : toJSON(), or else the attributes of the object"""
+    to_json = getattr(obj, "toJSON", None)
+    if to_json is not None:
+        return to_json()
     try:
-        return obj.toJSON()
-    except Exception as f:
-        print('Exception for toJSON', f, type(obj))
         return obj.__dict__
+    except AttributeError:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Serializer:
+    """`default` hook for json.dumps / orjson.dumps, memoizing the fragments of
+    the registered types with memoize=True (for the current document) or
+    shared=True (for every document of this instance). Use one instance per response.
+
+    `serializers` overrides the registered serializers of some types, for this
+    instance only (ex: {ShowtimeWithCinema: without_link}).
+    """
+
+    def __init__(self, serializers: Optional[Dict[type, Callable]] = None):
+        self._overrides = serializers or {}
+        self._fragments = {}  # id(obj) -> (obj, fragment), obj keeps the id valid
+        self._document_fragments = {}  # Same, emptied after each document
+
+    def default(self, obj):
+        override = self._overrides.get(type(obj))
+        if override is not None:
+            return override(obj)
+        found = _find_serializer(type(obj))
+        if found is None:
+            return _fallback(obj)
+        serializer, memoize, shared = found
+        if not memoize:
+            return serializer(obj)
+        fragments = self._fragments if shared else self._document_fragments
+        memoized = fragments.get(id(obj))
+        if memoized is None:
+            memoized = fragments[id(obj)] = (obj, serializer(obj))
+        return memoized[1]
+
+    def dumps(self, obj, indent: bool = False) -> bytes:
+        """Encodes `obj` to UTF-8 JSON (compact, or indented with 2 spaces)"""
+        try:
+            return self._dumps(obj, indent)
+        finally:
+            self._document_fragments.clear()
+
+    def _dumps(self, obj, indent: bool) -> bytes:
+        if orjson is not None:
+            option = orjson.OPT_PASSTHROUGH_DATACLASS  # Dataclasses go through `default`
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option)
+        # Raw UTF-8, like orjson : the same document gives the same bytes (and ETag)
+        if indent:
+            return json.dumps(
+                obj, default=self.default, indent=2, ensure_ascii=False
+            ).encode("utf-8")
+        return json.dumps(
+            obj, default=self.default, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
+    def dumps_str(self, obj, indent: bool = False) -> str:
+        return self.dumps(obj, indent=indent).decode("utf-8")
+
+    def iter_array(self, objs, indent: bool = False):
+        """Yields the JSON array of `objs` (same bytes as dumps(list(objs))), one
+        element at a time, so that the elements are not kept in memory"""
+        first = True
+        for obj in objs:
+            body = self.dumps(obj, indent=indent)
+            if indent:  # The strings of the JSON contain no raw line break
+                yield (b"[\n  " if first else b",\n  ") + body.replace(b"\n", b"\n  ")
+            else:
+                yield (b"[" if first else b",") + body
+            first = False
+        if first:
+            yield b"[]"
+        else:
+            yield b"\n]" if indent else b"]"
+
+
+def dumper(obj):
+    """`default` hook for json.dumps, without memoization"""
+    return Serializer().default(obj)
+
+
+register(MovieVersion, MovieVersion.toJSON, shared=True)
+register(Cinema, Cinema.toJSON, memoize=True)
+register(ShowtimeWithCinema, ShowtimeWithCinema.toJSON)
@@ -0,0 +1,177 @@
+"""Cache of the rendered HTTP responses of wsgi.py, with strong ETags."""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+DEFAULT_RESPONSE_TTL = 10 * 60  # In seconds
+DEFAULT_MAX_RESPONSES = 256
+DEFAULT_SNAPSHOT_INTERVAL = 60 * 60  # In seconds
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderedResponse:
+    body: bytes
+    etag: str  # Strong ETag, without the quotes
+    expires_at: float
+
+    @classmethod
+    def from_body(cls, body: bytes, expires_at: float):
+        return cls(body=body, etag=hashlib.sha256(body).hexdigest()[:32], expires_at=expires_at)
+
+
+def normalize_hour(hour: Optional[str]) -> Optional[str]:
+    """Same key for the equivalent `start` / `end` arguments
+    > normalize_hour(" 9:05")
+    '09:05'
+    """
+    if hour is None or not hour.strip():
+        return None
+    try:
+        return datetime.strptime(hour.strip(), "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return hour
+
+
+class RenderedCache:
+    """LRU cache of the rendered bodies, with a time to live.
+    It can be used from several threads (a Flask app may be threaded).
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_RESPONSE_TTL,
+        max_entries: int = DEFAULT_MAX_RESPONSES,
+        clock=time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> RenderedResponse
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[RenderedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body: bytes) -> RenderedResponse:
+        entry = RenderedResponse.from_body(body, expires_at=self.clock() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_render(self, key, render: Callable[[], str]) -> RenderedResponse:
+        """Returns the cached response of `key`, or renders (and caches) it"""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.set(key, render().encode("utf-8"))
+        return entry
+
+    def max_age(self, entry: RenderedResponse) -> int:
+        """Remaining time to live of `entry`, in seconds (for Cache-Control)"""
+        return max(0, math.ceil(entry.expires_at - self.clock()))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RenderedSnapshot:
+    """Rendered body rebuilt every `interval` seconds by a background thread.
+
+    The new response replaces the former one in a single assignment, so the
+    readers always get a complete snapshot, and never wait for a refresh
+    (except for the very first one). If a refresh fails, the former snapshot is kept.
+    Without the background thread (not started, stopped, or lost in a fork), an
+    expired snapshot is rebuilt by the next `get` instead.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[], str],
+        interval: float = DEFAULT_SNAPSHOT_INTERVAL,
+        clock=time.monotonic,
+    ):
+        self.render = render
+        self.interval = interval
+        self.clock = clock
+        self.refreshes = 0
+        self.failures = 0
+        self._entry: Optional[RenderedResponse] = None
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def get(self) -> RenderedResponse:
+        entry = self._entry
+        if entry is None or (not self.running and entry.expires_at <= self.clock()):
+            with self._refresh_lock:  # Waits for the warm-up, if it is running
+                if self._entry is entry:
+                    self._refresh()
+            entry = self._entry
+        return entry
+
+    @property
+    def running(self) -> bool:
+        """True while the background thread refreshes the snapshot"""
+        return self._thread is not None and self._thread.is_alive() and not self._stopped.is_set()
+
+    def refresh(self):
+        with self._refresh_lock:
+            self._refresh()
+
+    def _refresh(self):
+        body = self.render().encode("utf-8")
+        self._entry = RenderedResponse.from_body(body, expires_at=self.clock() + self.interval)
+        self.refreshes += 1
+
+    def start(self, warm_up: bool = True):
+        """Starts the background refresh. With `warm_up`, the first snapshot is
+        built right away, instead of on the first `get`."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(warm_up,), name="rendered-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, warm_up: bool):
+        if warm_up:
+            self._safe_refresh()
+        while not self._stopped.wait(self.interval):
+            self._safe_refresh()
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            self.failures += 1
+            logger.exception("Snapshot refresh failed, the former snapshot is kept")
+
+    def stop(self):
+        self._stopped.set()
+
+    def max_age(self, entry: RenderedResponse) -> int:
+        """Time until the next refresh of `entry`, in seconds (for Cache-Control)"""
+        return max(0, math.ceil(entry.expires_at - self.clock()))
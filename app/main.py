@@ -1,14 +1,15 @@
 from dataclasses import dataclass
-import json
+from functools import partial
 from typing import List
 from allocine import Allocine
 from prettytable import PrettyTable, UNICODE, FRAME, ALL
 from datetime import date, timedelta, datetime
-from app.formatting import dumper
+from app import formatting
 
 from data.aggregation import ShowtimeWithCinema
 from data.cinemas import Cinema
 from data.movies import MovieVersion
+from helpers.schedules import datetime_to_minutes
 
 def extract_field_names(dict_list):
     """Returns a sorted list of field names from a dictionary list
@@ -31,12 +32,23 @@ class DayFilmShowtimes:
     day: str
     showings: List[FilmShowtimesGroup]
 
-def display_cinema_json(cinema, showings: List[DayFilmShowtimes]):
-    log = json.dumps({
+formatting.register(FilmShowtimesGroup, lambda group: {'film': group.film, 'showtimes': group.showtimes})
+formatting.register(DayFilmShowtimes, lambda day: {'day': day.day, 'showings': day.showings})
+
+def display_cinema_json(cinema, showings: List[DayFilmShowtimes], serializer=None):
+    serializer = serializer or formatting.Serializer()
+    return serializer.dumps_str({
+        'cinema': cinema,
+        'showings': showings
+    }, indent=True)
+
+def display_cinema_ndjson(cinema, showings: List[DayFilmShowtimes], serializer=None):
+    """A single line of compact JSON (same content as display_cinema_json)"""
+    serializer = serializer or formatting.Serializer()
+    return serializer.dumps_str({
         'cinema': cinema,
         'showings': showings
-    }, default=dumper, indent=2)
-    return log
+    }) + "\n"
 
 def get_all_days_seance_data(cinema: Cinema, days: List[str], is_showtime_eligible) -> List[DayFilmShowtimes]:
     return [DayFilmShowtimes(
@@ -76,6 +88,54 @@ def check_showtime_eligibility(showtime, jour, earliest_time, latest_time):
         end is None or showtime.end_time is None or showtime.end_time < end
     )
 
+
+class ShowtimeFilter:
+    """The filters of get_showings, compiled once and reused for every cinema.
+
+    The hours are parsed in the constructor, and the bounds of each day are
+    resolved (as minutes since the epoch) the first time the day is seen.
+    Same result as check_showtime_eligibility, without a strptime per showtime.
+    """
+
+    def __init__(self, earliest_time=None, latest_time=None, card=None):
+        self.earliest_time = parse_hour(earliest_time)
+        self.latest_time = parse_hour(latest_time)
+        self.card = card
+        self._bounds = {}  # date -> (start_minute_min, end_minute_max)
+
+    def bounds(self, jour):
+        bounds = self._bounds.get(jour)
+        if bounds is None:
+            bounds = self._bounds[jour] = (
+                day_minutes(jour, self.earliest_time),
+                day_minutes(jour, self.latest_time),
+            )
+        return bounds
+
+    def accepts_cinema(self, cinema):
+        return check_cinema_late_eligibility_rules(cinema, self.card)
+
+    def __call__(self, showtime, jour):
+        start, end = self.bounds(jour)
+        return (start is None or showtime.start_minute > start) and (
+            end is None or showtime.end_minute is None or showtime.end_minute < end
+        )
+
+
+def parse_hour(time):
+    """> parse_hour("20:30")
+    datetime.time(20, 30)
+    """
+    if time is None:
+        return None
+    return datetime.strptime(time, "%H:%M").time()
+
+
+def day_minutes(jour, hour):
+    if hour is None:
+        return None
+    return datetime_to_minutes(datetime.combine(jour, hour))
+
 def display_cinema(cinema, seance_data_all_days: List[DayFilmShowtimes], entrelignes):
     tables = []
     result = ""
@@ -87,17 +147,18 @@ def display_cinema(cinema, seance_data_all_days: List[DayFilmShowtimes], entreli
             tables += [seance_data.day, get_showtime_table(seances, entrelignes)]
 
     if len(tables) > 0:
-        result += (f"{cinema.name} - {cinema.allocine_cinema_id}") + "\n"
-        log_v(f"https://allocine.fr/seance/salle_gen_csalle={cinema.allocine_cinema_id}.html")
+        result += (f"{cinema.name} - {cinema.allocine_id}") + "\n"
+        log_v(f"https://allocine.fr/seance/salle_gen_csalle={cinema.allocine_id}.html")
         result += (f"{cinema.address}, {cinema.zipcode}, {cinema.city}") + "\n"
-        log_v("\n".join((f'✔️  {x.get("label")}' for x in cinema.member_cards)))
+        if log_level == "VERBOSE":  # The member cards may need a request
+            log_v("\n".join((f'✔️  {x.get("label")}' for x in cinema.member_cards or [])))
         for table in tables:
             result += (table) + "\n"
 
         return result
 
     else:
-        print(f"{cinema.name} - {cinema.allocine_cinema_id} has no eligible showings.")
+        print(f"{cinema.name} - {cinema.allocine_id} has no eligible showings.")
 
 
 def get_seance_data(cinema, jour, is_showtime_eligible) -> List[FilmShowtimesGroup]:
@@ -183,6 +244,14 @@ def log_v(message):
         print(message)
 
 
+def iter_cinemas_per_page(allocine, allocine_cinema_ids):
+    """Yields the cinemas of `allocine_cinema_ids`, one showtimelist page at a time"""
+    for i in range(0, len(allocine_cinema_ids), allocine.page_size):
+        yield from allocine.get_cinemas(
+            allocine_cinema_ids=allocine_cinema_ids[i:i + allocine.page_size]
+        )
+
+
 def get_showings(
     id_cinema,
     entrelignes=False,
@@ -191,16 +260,29 @@ def get_showings(
     card=None,
     earliest_time=None,
     latest_time=None,
-    format=None
+    format=None,
+    cache=None,
+    links=True,
 ):
     """
     Les séances de votre cinéma dans le terminal, avec
     ID_CINEMA : identifiant du cinéma sur Allociné,
     ex: C0159 pour l'UGC Ciné Cité Les Halles. Se trouve dans l'url :
     https://allocine.fr/seance/salle_gen_csalle=<ID_CINEMA>.html
+    FORMAT : None (tableaux), "json" (un document par cinéma)
+    ou "ndjson" (une ligne de JSON compact par cinéma, envoyée dès qu'il est chargé)
+    CACHE : ResponseCache optionnel, pour ne pas refaire les requêtes récentes
+    LINKS : en JSON, ajoute à chaque séance son lien Google Agenda
     """
     today = date.today()
-    allocine = Allocine()
+    # The table only shows the fields of the showtimelist payload :
+    # the details of the movies are requested only if they are accessed (JSON).
+    # The member cards checked for `card` are requested concurrently, per page.
+    allocine = Allocine(
+        cache=cache,
+        lazy_details=format not in ("json", "ndjson"),
+        prefetch_member_cards=card is not None,
+    )
 
     jours = []
     if semaine is False:
@@ -218,20 +300,33 @@ def get_showings(
             jours.append(jour_obj.strftime("%d/%m/%Y"))
 
     if id_cinema is None:
-        codes = allocine.get_cinema_ids(83165)
+        # The geocode pages already contain the showtimes of every cinema,
+        # which are displayed as soon as their page is parsed
+        cinemas = allocine.iter_cinemas(83165)
+    elif format == "ndjson":
+        # Each page of theaters is sent before the next one is requested
+        cinemas = iter_cinemas_per_page(allocine, id_cinema.split(","))
     else:
-        codes = id_cinema.split(",")
+        # Several theaters are requested per showtimelist page
+        cinemas = allocine.get_cinemas(allocine_cinema_ids=id_cinema.split(","))
+
+    # Compiled once, and reused for every cinema
+    showtime_filter = ShowtimeFilter(
+        earliest_time=earliest_time, latest_time=latest_time, card=card
+    )
 
-    is_showtime_eligible = lambda showtime, jour: check_showtime_eligibility(
-        showtime, jour, earliest_time, latest_time
+    # The JSON of each movie is built once, for all the cinemas
+    serializer = formatting.Serializer(
+        None if links else {ShowtimeWithCinema: partial(ShowtimeWithCinema.toJSON, link=False)}
     )
 
-    for code in codes:
-        cinema = allocine.get_cinema(allocine_cinema_id=code)
-        if check_cinema_late_eligibility_rules(cinema, card):
-            all_days_seance_data = get_all_days_seance_data(cinema, jours, is_showtime_eligible)
+    for cinema in cinemas:
+        if showtime_filter.accepts_cinema(cinema):
+            all_days_seance_data = get_all_days_seance_data(cinema, jours, showtime_filter)
 
             if format == "json":
-                yield display_cinema_json(cinema, all_days_seance_data)
+                yield display_cinema_json(cinema, all_days_seance_data, serializer)
+            elif format == "ndjson":
+                yield display_cinema_ndjson(cinema, all_days_seance_data, serializer)
             else:
                 yield display_cinema(cinema, all_days_seance_data, entrelignes)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""Parse throughput of the showtimelist payloads, in showtimes per second.
+
+Usage : python -m benchmarks.bench_decoder [--payload recorded_showtimelist.json]
+"""
+
+import json
+import time
+
+import click
+import jmespath
+
+from allocine import Allocine, MovieCache
+from allocine.decoder import decode_movie_info, decode_showtimelist
+from benchmarks.payloads import InMemoryClient, count_showtimes, make_region, make_showtimelist
+
+
+def legacy_decode(raw_showtimelist):
+    """The jmespath accessors used before allocine.decoder"""
+    decoded = []
+    for cinema_showtime in jmespath.search("feed.theaterShowtimes", raw_showtimelist):
+        raw_cinema = jmespath.search("place.theater", cinema_showtime)
+        for s in jmespath.search("movieShowtimes", cinema_showtime) or []:
+            raw_movie = jmespath.search("onShow.movie", s)
+            decoded.append(
+                (
+                    raw_cinema.get("code"),
+                    raw_movie.get("code"),
+                    jmespath.search('version."$"', s),
+                    jmespath.search('screenFormat."$"', s),
+                    jmespath.search("statistics.userRating", raw_movie),
+                    jmespath.search("poster.href", raw_movie),
+                    [(d.get("d"), [t.get("$") for t in d.get("t") or []]) for d in s.get("scr") or []],
+                )
+            )
+    return decoded
+
+
+def legacy_decode_movie_info(movie_info):
+    return (
+        jmespath.search('nationality[]."$"', movie_info),
+        jmespath.search('genre[]."$"', movie_info),
+        jmespath.search("castingShort.directors", movie_info),
+        jmespath.search("castingShort.actors", movie_info),
+    )
+
+
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.option("--payload", type=click.Path(exists=True), help="recorded /showtimelist payload")
+@click.option("--theaters", default=60, help="number of theaters of the synthetic payload")
+@click.option("--repeat", default=5, help="number of runs (the best one is kept)")
+def main(payload, theaters, repeat):
+    theater_showtimes, movie_infos, theater_infos = make_region(n_theaters=theaters)
+    if payload:
+        with open(payload) as f:
+            raw_showtimelist = json.load(f)
+    else:
+        raw_showtimelist = make_showtimelist(theater_showtimes)
+    n_showtimes = count_showtimes(raw_showtimelist["feed"]["theaterShowtimes"])
+    n_entries = sum(
+        len(t["movieShowtimes"]) for t in raw_showtimelist["feed"]["theaterShowtimes"]
+    )
+    click.echo(f"{n_showtimes} showtimes, {n_entries} movie showtimes entries")
+
+    # Both sides decode the showtimelist and the info of every movie once
+    def legacy():
+        legacy_decode(raw_showtimelist)
+        for movie_info in movie_infos.values():
+            legacy_decode_movie_info(movie_info["movie"])
+
+    def decoder():
+        decode_showtimelist(raw_showtimelist)
+        for movie_info in movie_infos.values():
+            decode_movie_info(movie_info["movie"])
+
+    for name, func in (("jmespath", legacy), ("decoder", decoder)):
+        duration = measure(func, repeat)
+        click.echo(f"{name:>10} : {n_showtimes / duration:12,.0f} showtimes/s ({duration * 1000:.1f} ms)")
+
+    if not payload:
+        client = InMemoryClient(theater_showtimes, movie_infos, theater_infos)
+
+        def end_to_end():
+            Allocine(client=client, movie_cache=MovieCache(), max_concurrency=1).search_cinemas(83165)
+
+        duration = measure(end_to_end, repeat)
+        click.echo(f"{'Allocine':>10} : {n_showtimes / duration:12,.0f} showtimes/s ({duration * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
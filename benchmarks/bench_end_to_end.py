@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""End-to-end time of get_showings and of the /showings route of wsgi.py,
+against the local fake API (benchmarks.fake_api), so without any network.
+
+Each run starts with an empty movie cache, so the movies are requested again.
+
+Usage : python -m benchmarks.bench_end_to_end [--latency 0.02] [--error-rate 0.05]
+        python -m benchmarks.bench_end_to_end --fixtures DIR --ids P0645,C0159
+"""
+
+from unittest import mock
+
+import click
+
+from allocine import default_movie_cache
+from allocine.client import Client
+from app.main import get_showings
+from benchmarks.bench_decoder import measure
+from benchmarks.fake_api import FakeAllocineServer, make_source
+from wsgi import create_app
+
+
+@click.command()
+@click.option("--fixtures", default=None, help="directory of the recorded responses (synthetic region otherwise)")
+@click.option("--ids", default=None, help="allocine ids of the cinemas (default : those of the synthetic region)")
+@click.option("--theaters", default=20, help="number of cinemas of the synthetic region")
+@click.option("--latency", default=0.02, help="delay of each response, in seconds")
+@click.option("--jitter", default=0.01, help="additional random delay, in seconds")
+@click.option("--error-rate", default=0.0, help="proportion of the requests answered 503")
+@click.option("--repeat", default=3, help="number of runs (the best one is kept)")
+def main(fixtures, ids, theaters, latency, jitter, error_rate, repeat):
+    if ids is None:
+        if fixtures:
+            raise click.UsageError("--ids is required with --fixtures")
+        ids = ",".join(f"C{t:04d}" for t in range(theaters))
+    server = FakeAllocineServer(
+        make_source(fixtures, theaters), latency=latency, jitter=jitter, error_rate=error_rate
+    )
+    app = create_app(
+        test_config={
+            "RESPONSE_CACHE_PATH": None,
+            "RENDERED_RESPONSE_TTL": 0,
+            "CINEMAS_SNAPSHOT_REFRESH": False,
+        }
+    )
+    http = app.test_client()
+
+    def cold(func):
+        def run():
+            default_movie_cache.clear()
+            return func()
+        return run
+
+    runs = [
+        ("get_showings (tables)", lambda: list(get_showings(ids))),
+        ("get_showings (json)", lambda: list(get_showings(ids, format="json"))),
+        ("GET /showings", lambda: http.get(f"/showings/{ids}").get_data()),
+        ("GET /showings?format=ndjson", lambda: http.get(f"/showings/{ids}?format=ndjson").get_data()),
+    ]
+    click.echo(
+        f"{len(ids.split(','))} cinemas, {latency * 1000:.0f} ms (+{jitter * 1000:.0f} ms) "
+        f"per request, {error_rate:.0%} of 503"
+    )
+    with server, mock.patch.object(Client, "_instance", Client(server.base_url, shared=False)):
+        for name, func in runs:
+            before = server.stats()
+            duration = measure(cold(func), repeat)
+            after = server.stats()
+            requests = (after["requests"] - before["requests"]) / repeat
+            errors = (after["errors"] - before["errors"]) / repeat
+            click.echo(
+                f"{name:>28} : {duration * 1000:8.1f} ms ({requests:.0f} requests, {errors:.0f} 503 per run)"
+            )
+        click.echo(f"rate limiter : {Client._instance.rate_limiter.stats()}")
+
+
+if __name__ == "__main__":
+    main()
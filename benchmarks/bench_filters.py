@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Time-window filtering of the showtimes of a whole region : a
+check_showtime_eligibility lambda per showtime (as get_showings did), the
+compiled ShowtimeFilter, and the columnar store.
+
+Usage : python -m benchmarks.bench_filters [--theaters 60]
+"""
+
+from datetime import date, datetime
+
+import click
+
+from allocine import Allocine, MovieCache
+from app.main import ShowtimeFilter, check_showtime_eligibility
+from data.aggregation import ShowtimeWithCinema
+from data.columnar import ShowtimeColumns
+from benchmarks.bench_decoder import measure
+from benchmarks.payloads import InMemoryClient
+
+DAY = date(2020, 3, 5)
+EARLIEST_TIME, LATEST_TIME = "12:00", "22:30"
+
+
+@click.command()
+@click.option("--theaters", default=60, help="number of theaters of the synthetic region")
+@click.option("--repeat", default=5, help="number of runs (the best one is kept)")
+def main(theaters, repeat):
+    client = InMemoryClient.from_region(n_theaters=theaters)
+    cinemas = Allocine(client=client, movie_cache=MovieCache()).search_cinemas(83165)
+    n_showtimes = sum(len(cinema.showtimes) for cinema in cinemas)
+    click.echo(f"{n_showtimes} showtimes")
+
+    def per_showtime(is_showtime_eligible):
+        return [
+            ShowtimeWithCinema(cinema=cinema, showtime=showtime)
+            for cinema in cinemas
+            for showtime in cinema.get_showtimes_of_a_day(DAY)
+            if is_showtime_eligible(showtime, DAY)
+        ]
+
+    def with_lambda():
+        return per_showtime(
+            lambda showtime, jour: check_showtime_eligibility(
+                showtime, jour, EARLIEST_TIME, LATEST_TIME
+            )
+        )
+
+    def compiled():
+        return per_showtime(ShowtimeFilter(earliest_time=EARLIEST_TIME, latest_time=LATEST_TIME))
+
+    columns = ShowtimeColumns.from_cinemas(cinemas)
+    criteria = dict(
+        date=DAY,
+        starts_after=datetime(2020, 3, 5, 12, 0),
+        ends_before=datetime(2020, 3, 5, 22, 30),
+    )
+    assert len(with_lambda()) == len(compiled()) == len(columns.filter(**criteria))
+
+    backend = "numpy" if columns.use_numpy else "lists"
+    for name, func in (
+        ("lambda", with_lambda),
+        ("compiled filter", compiled),
+        (f"columns ({backend})", lambda: columns.filter(**criteria)),
+        (f"select ({backend})", lambda: columns.select(**criteria)),
+    ):
+        duration = measure(func, repeat)
+        click.echo(f"{name:>16} : {n_showtimes / duration:12,.0f} showtimes/s ({duration * 1000:.1f} ms)")
+
+    duration = measure(lambda: ShowtimeColumns.from_cinemas(cinemas), repeat)
+    click.echo(f"{'build':>16} : {duration * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""Memory retained per showtime, once a region's week is parsed.
+
+The former representation (dataclasses with a __dict__, two datetimes per
+showtime, one copy of each language / screen format string per movie version)
+is compared with the slotted one.
+
+Usage : python -m benchmarks.bench_memory [--theaters 60]
+"""
+
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import click
+
+from allocine.decoder import _get_text, decode_showtimelist
+from data.movies import MovieVersion
+from data.showtimes import Showtime
+from helpers.schedules import datetime_to_minutes
+from benchmarks.payloads import count_showtimes, make_region, make_showtimelist
+
+
+# === Replicas of the former dataclasses ===
+@dataclass
+class LegacyMovieVersion:
+    movie_id: int
+    title: str
+    original_title: str
+    rating: Optional[float]
+    duration: Optional[timedelta]
+    genres: str
+    countries: List[str]
+    directors: str
+    actors: str
+    synopsis: str
+    year: int
+    poster: str
+    language: str
+    screen_format: str
+
+
+@dataclass
+class LegacyShowtime:
+    date_time: datetime
+    end_time: Optional[datetime]
+    movie: LegacyMovieVersion
+
+
+# === Builders ===
+def build_legacy(raw_showtimelist):
+    showtimes = []
+    for raw_theater_showtimes in raw_showtimelist["feed"]["theaterShowtimes"]:
+        for s in raw_theater_showtimes["movieShowtimes"]:
+            raw_movie = s["onShow"]["movie"]
+            duration = timedelta(seconds=raw_movie["runtime"])
+            movie = LegacyMovieVersion(
+                movie_id=raw_movie["code"],
+                title=raw_movie["title"],
+                original_title=None,
+                rating=raw_movie["statistics"]["userRating"],
+                duration=duration,
+                genres=None,
+                countries=None,
+                directors=None,
+                actors=None,
+                synopsis=None,
+                year=None,
+                poster=raw_movie["poster"]["href"],
+                language=_get_text(s, "version"),
+                screen_format=_get_text(s, "screenFormat"),
+            )
+            for day in s["scr"]:
+                for t in day["t"]:
+                    start = datetime.strptime(f"{day['d']}T{t['$']}:00", "%Y-%m-%dT%H:%M:%S")
+                    end = start + duration + timedelta(seconds=900)
+                    showtimes.append(LegacyShowtime(start, end, movie))
+    return showtimes
+
+
+def build_slotted(raw_showtimelist):
+    showtimes = []
+    for record in decode_showtimelist(raw_showtimelist).theater_showtimes:
+        for s in record.movie_showtimes:
+            movie = MovieVersion(
+                movie_id=s.movie_id,
+                title=s.title,
+                original_title=None,
+                rating=s.rating,
+                duration=timedelta(seconds=s.runtime),
+                genres=None,
+                countries=None,
+                directors=None,
+                actors=None,
+                synopsis=None,
+                year=None,
+                poster=s.poster,
+                language=s.language,
+                screen_format=s.screen_format,
+            )
+            duration_in_minutes = s.runtime // 60 + 15
+            for day, hours in s.days:
+                for hour in hours:
+                    start = datetime_to_minutes(
+                        datetime.strptime(f"{day}T{hour}:00", "%Y-%m-%dT%H:%M:%S")
+                    )
+                    showtimes.append(
+                        Showtime.from_minutes(start, start + duration_in_minutes, movie)
+                    )
+    return showtimes
+
+
+def retained_bytes(build, body: str) -> int:
+    """Bytes still allocated once the raw payload is released"""
+    gc.collect()
+    tracemalloc.start()
+    raw_showtimelist = json.loads(body)
+    showtimes = build(raw_showtimelist)
+    del raw_showtimelist
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del showtimes
+    return retained
+
+
+@click.command()
+@click.option("--theaters", default=60, help="number of theaters of the synthetic region")
+def main(theaters):
+    theater_showtimes, _, _ = make_region(n_theaters=theaters)
+    body = json.dumps(make_showtimelist(theater_showtimes))
+    n_showtimes = count_showtimes(theater_showtimes)
+    click.echo(f"{n_showtimes} showtimes")
+
+    results = {}
+    for name, build in (("dataclass", build_legacy), ("slotted", build_slotted)):
+        results[name] = retained_bytes(build, body)
+        click.echo(
+            f"{name:>10} : {results[name] / n_showtimes:8.1f} bytes/showtime"
+            f" ({results[name] / 1024:,.0f} KiB)"
+        )
+    click.echo(f"{'ratio':>10} : {results['dataclass'] / results['slotted']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
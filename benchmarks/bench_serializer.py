@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""JSON serialization of a week of showings of several cinemas : the former
+`dumper` hook versus app.formatting.Serializer (json module, and orjson when installed).
+
+Usage : python -m benchmarks.bench_serializer [--theaters 10] [--no-links]
+"""
+
+import contextlib
+import io
+import json
+from datetime import date, timedelta
+from functools import partial
+from unittest import mock
+
+import click
+
+from allocine import Allocine, MovieCache
+from app import formatting
+from app.main import ShowtimeFilter, get_all_days_seance_data
+from data.aggregation import ShowtimeWithCinema
+from benchmarks.bench_decoder import measure
+from benchmarks.payloads import InMemoryClient
+
+
+def legacy_dumper(obj):
+    try:
+        return obj.toJSON()
+    except Exception as f:
+        print("Exception for toJSON", f, type(obj))
+        return obj.__dict__
+
+
+@click.command()
+@click.option("--theaters", default=10, help="number of cinemas of the payload")
+@click.option("--repeat", default=5, help="number of runs (the best one is kept)")
+@click.option("--links/--no-links", default=True, help="Google Calendar link of each showtime")
+def main(theaters, repeat, links):
+    today = date.today()
+    client = InMemoryClient.from_region(n_theaters=theaters, first_day=today)
+    cinemas = Allocine(client=client, movie_cache=MovieCache()).search_cinemas(83165)
+    days = [(today + timedelta(days=d)).strftime("%d/%m/%Y") for d in range(7)]
+    documents = [
+        {"cinema": cinema, "showings": get_all_days_seance_data(cinema, days, ShowtimeFilter())}
+        for cinema in cinemas
+    ]
+
+    def legacy(indent):
+        options = dict(indent=2) if indent else dict(separators=(",", ":"))
+        with contextlib.redirect_stdout(io.StringIO()):  # The prints of the former hook
+            return [
+                json.dumps(document, default=legacy_dumper, **options).encode("utf-8")
+                for document in documents
+            ]
+
+    overrides = None if links else {
+        ShowtimeWithCinema: partial(ShowtimeWithCinema.toJSON, link=False)
+    }
+
+    def serializer(indent):
+        serializer = formatting.Serializer(overrides)
+        return [serializer.dumps(document, indent=indent) for document in documents]
+
+    def serializer_json(indent):
+        with mock.patch.object(formatting, "orjson", None):
+            return serializer(indent)
+
+    runs = [("dumper", legacy), ("json", serializer_json)]
+    if formatting.orjson is not None:
+        runs.append(("orjson", serializer))
+    for indent in (True, False):
+        size = sum(len(body) for body in serializer_json(indent))
+        click.echo(
+            f"{len(documents)} cinemas, {size / 1024:,.0f} KiB of "
+            f"{'indented' if indent else 'compact'} JSON"
+        )
+        for name, func in runs:
+            duration = measure(lambda: func(indent), repeat)
+            click.echo(f"{name:>8} : {duration * 1000:8.1f} ms ({size / duration / 2 ** 20:6.1f} MiB/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""Decoding of the showtime timestamps of a region : a strptime per showtime
+(str_datetime_to_datetime_obj) versus day_hours_to_minutes.
+
+Usage : python -m benchmarks.bench_timestamps [--theaters 60]
+"""
+
+import click
+
+from allocine.decoder import decode_showtimelist
+from helpers.cleaners import day_hours_to_minutes, str_datetime_to_datetime_obj
+from helpers.schedules import datetime_to_minutes
+from benchmarks.bench_decoder import measure
+from benchmarks.payloads import make_region, make_showtimelist
+
+
+@click.command()
+@click.option("--theaters", default=60, help="number of theaters of the synthetic region")
+@click.option("--repeat", default=5, help="number of runs (the best one is kept)")
+def main(theaters, repeat):
+    theater_showtimes, _, _ = make_region(n_theaters=theaters)
+    records = decode_showtimelist(make_showtimelist(theater_showtimes)).theater_showtimes
+    days = [
+        (day, hours)
+        for record in records
+        for movie_showtimes in record.movie_showtimes
+        for day, hours in movie_showtimes.days
+    ]
+    n_showtimes = sum(len(hours) for _, hours in days)
+    click.echo(f"{n_showtimes} showtimes, {len(days)} days entries")
+
+    def with_strptime():
+        return [
+            datetime_to_minutes(str_datetime_to_datetime_obj("{}T{}:00".format(day, hour)))
+            for day, hours in days
+            for hour in hours
+        ]
+
+    def with_tables():
+        return [minute for day, hours in days for minute in day_hours_to_minutes(day, hours)]
+
+    assert with_strptime() == with_tables()
+    for name, func in (("strptime", with_strptime), ("tables", with_tables)):
+        duration = measure(func, repeat)
+        click.echo(f"{name:>10} : {n_showtimes / duration:12,.0f} showtimes/s ({duration * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+"""Local stand-in of the Allociné API, with configurable latency and errors.
+
+It serves the fixtures recorded by allocine.replay (--fixtures), or a synthetic
+region (benchmarks.payloads) otherwise. Point a Client at `server.base_url` :
+
+    with FakeAllocineServer(RegionTransport.from_region(), latency=0.05) as server:
+        allocine = Allocine(client=Client(server.base_url, shared=False))
+
+Usage : python -m benchmarks.fake_api [--fixtures DIR] [--port 8765] [--latency 0.05]
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+from allocine.cache import get_endpoint
+from allocine.replay import FixtureStore, MissingFixture, ReplayTransport, StoredResponse
+from benchmarks.payloads import InMemoryClient
+
+
+class RegionTransport:
+    """Transport answering the API urls from an InMemoryClient (synthetic region)"""
+
+    def __init__(self, client: InMemoryClient):
+        self.client = client
+
+    @classmethod
+    def from_region(cls, **kwargs):
+        return cls(InMemoryClient.from_region(**kwargs))
+
+    def get(self, url: str, **kwargs) -> StoredResponse:
+        query = {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+        page, count = int(query.get("page", 1)), int(query.get("count", 10))
+        try:
+            endpoint = get_endpoint(url)
+            if endpoint == "showtimelist" and "theaters" in query:
+                payload = self.client.get_showtimelist_by_cinema_ids(
+                    query["theaters"].split(","), page=page, count=count
+                )
+            elif endpoint == "showtimelist":
+                payload = self.client.get_showtimelist_from_geocode(
+                    int(query["geocode"]), page=page, count=count
+                )
+            elif endpoint == "theater":
+                payload = self.client.get_cinema_info_by_id(query["code"])
+            elif endpoint == "movie":
+                payload = self.client.get_movie_info_by_id(int(query["code"]))
+            else:
+                return StoredResponse(404, {"error": f"Unknown endpoint {endpoint!r}"})
+        except (KeyError, ValueError):
+            return StoredResponse(404, {"error": "Not found"})
+        return StoredResponse(200, payload)
+
+
+class FakeAllocineServer:
+    """HTTP server answering from `source` (any transport, ex: ReplayTransport),
+    in a background thread.
+
+    Each response is delayed by `latency` seconds, plus up to `jitter` seconds,
+    and a proportion `error_rate` of the requests get an `error_status` instead.
+    The random draws are seeded, so a run can be reproduced.
+    """
+
+    def __init__(
+        self,
+        source,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,  # 0 : any free port
+    ):
+        self.source = source
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0  # Injected errors
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/rest/v3"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, payload = server.respond(self.path)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # No line per request on stderr
+                pass
+
+        return Handler
+
+    def respond(self, path: str):
+        """(status, payload) of the request of `path`"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self.error_status, {"error": "Injected error"}
+        try:
+            response = self.source.get(path)
+        except MissingFixture as e:
+            return 404, {"error": str(e)}
+        return response.status_code, response.json()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever,
+                kwargs={"poll_interval": 0.05},  # Quick stop()
+                name="fake-allocine",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serves in the current thread, until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+def make_source(fixtures=None, theaters: int = 20):
+    """ReplayTransport of the `fixtures` directory, or else a synthetic region
+    (whose showtimes start today)"""
+    if fixtures:
+        return ReplayTransport(FixtureStore(fixtures))
+    return RegionTransport.from_region(n_theaters=theaters, first_day=date.today())
+
+
+@click.command()
+@click.option("--fixtures", default=None, help="directory of the recorded responses (synthetic region otherwise)")
+@click.option("--theaters", default=20, help="number of cinemas of the synthetic region")
+@click.option("--port", default=8765, help="port of the server")
+@click.option("--latency", default=0.0, help="delay of each response, in seconds")
+@click.option("--jitter", default=0.0, help="additional random delay, in seconds")
+@click.option("--error-rate", default=0.0, help="proportion of the requests answered 503")
+def main(fixtures, theaters, port, latency, jitter, error_rate):
+    server = FakeAllocineServer(
+        make_source(fixtures, theaters),
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        port=port,
+    )
+    click.echo(f"Serving on {server.base_url} (ALLOCINE_BASE_URL={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
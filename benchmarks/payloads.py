@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic Allociné payloads, shaped like the real ones, for the benchmarks."""
+
+import random
+from datetime import date, timedelta
+
+HOURS = ["10:15", "11:00", "13:45", "14:00", "16:30", "18:15", "19:45", "20:30", "22:00"]
+LANGUAGES = ["Français", "Anglais"]
+SCREEN_FORMATS = ["Numérique", "3D", "IMAX"]
+
+
+def make_region(
+    n_theaters: int = 60,
+    n_movies: int = 80,
+    movies_per_theater: int = 15,
+    n_days: int = 7,
+    slots_per_day: int = 4,
+    first_day: date = date(2020, 3, 4),
+    seed: int = 0,
+):
+    """Returns (theater_showtimes, movie_infos, theater_infos) of a region"""
+    rng = random.Random(seed)
+    days = [(first_day + timedelta(days=d)).isoformat() for d in range(n_days)]
+    movie_ids = list(range(100000, 100000 + n_movies))
+
+    theater_showtimes = []
+    for t in range(n_theaters):
+        code = f"C{t:04d}"
+        movie_showtimes = []
+        for movie_id in rng.sample(movie_ids, min(movies_per_theater, n_movies)):
+            movie_showtimes.append(
+                {
+                    "onShow": {
+                        "movie": {
+                            "code": movie_id,
+                            "title": f"Film {movie_id}",
+                            "runtime": rng.randrange(4800, 9000, 300),
+                            "statistics": {"userRating": round(rng.uniform(1, 5), 1)},
+                            "poster": {"href": f"https://example.com/{movie_id}.jpg"},
+                        }
+                    },
+                    "version": {"$": rng.choice(LANGUAGES)},
+                    "screenFormat": {"$": rng.choice(SCREEN_FORMATS)},
+                    "scr": [
+                        {"d": day, "t": [{"$": h} for h in sorted(rng.sample(HOURS, slots_per_day))]}
+                        for day in days
+                    ],
+                }
+            )
+        theater_showtimes.append(
+            {
+                "place": {
+                    "theater": {
+                        "code": code,
+                        "name": f"Cinéma {t}",
+                        "address": f"{t} boulevard du Cinéma",
+                        "postalCode": f"750{t % 20 + 1:02d}",
+                        "city": "Paris",
+                        "distance": 0,
+                    }
+                },
+                "movieShowtimes": movie_showtimes,
+            }
+        )
+
+    movie_infos = {
+        movie_id: {
+            "movie": {
+                "code": movie_id,
+                "originalTitle": f"Original film {movie_id}",
+                "productionYear": rng.randint(1950, 2020),
+                "synopsis": "<p>Un synopsis&nbsp;: " + "très long, " * 40 + "</p>",
+                "nationality": [{"$": "France"}, {"$": "Belgique"}],
+                "genre": [{"$": "Drame"}, {"$": "Comédie"}],
+                "castingShort": {"directors": "Agnès Varda", "actors": "Jeanne Moreau, Jean Gabin"},
+            }
+        }
+        for movie_id in movie_ids
+    }
+    theater_infos = {
+        t["place"]["theater"]["code"]: {
+            "theater": {"memberCard": [{"code": 106002, "label": "UGC Illimité"}]}
+        }
+        for t in theater_showtimes
+    }
+    return theater_showtimes, movie_infos, theater_infos
+
+
+def make_showtimelist(theater_showtimes, total_results=None):
+    return {
+        "feed": {
+            "totalResults": len(theater_showtimes) if total_results is None else total_results,
+            "theaterShowtimes": theater_showtimes,
+        }
+    }
+
+
+class InMemoryClient:
+    """Client serving a synthetic region without any latency"""
+
+    def __init__(self, theater_showtimes, movie_infos, theater_infos):
+        self.theater_showtimes = theater_showtimes
+        self.theaters = {t["place"]["theater"]["code"]: t for t in theater_showtimes}
+        self.movie_infos = movie_infos
+        self.theater_infos = theater_infos
+
+    @classmethod
+    def from_region(cls, **kwargs):
+        return cls(*make_region(**kwargs))
+
+    def get_showtimelist_by_cinema_id(self, allocine_cinema_id, page=1, count=10):
+        return self.get_showtimelist_by_cinema_ids(
+            allocine_cinema_id.split(","), page=page, count=count
+        )
+
+    def get_showtimelist_by_cinema_ids(self, allocine_cinema_ids, page=1, count=10):
+        theaters = [self.theaters[c] for c in allocine_cinema_ids if c in self.theaters]
+        return make_showtimelist(theaters[(page - 1) * count:page * count], len(theaters))
+
+    def get_showtimelist_from_geocode(self, geocode, page=1, count=10):
+        return make_showtimelist(
+            self.theater_showtimes[(page - 1) * count:page * count],
+            len(self.theater_showtimes),
+        )
+
+    def get_cinema_info_by_id(self, allocine_cinema_id):
+        return self.theater_infos[allocine_cinema_id]
+
+    def get_movie_info_by_id(self, movie_id):
+        return self.movie_infos[movie_id]
+
+
+def count_showtimes(theater_showtimes) -> int:
+    return sum(
+        len(day.get("t") or [])
+        for theater in theater_showtimes
+        for movie in theater["movieShowtimes"]
+        for day in movie.get("scr") or []
+    )
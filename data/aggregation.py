@@ -1,5 +1,6 @@
 
 from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import quote
 
 from data.cinemas import Cinema
@@ -15,18 +16,29 @@ class ShowtimeWithCinema:
     cinema: Cinema
     showtime: Showtime
 
-    def toJSON(self):
-        return {
+    def toJSON(self, link=True):
+        json = {
             'start_time': self.showtime.date_str,
             'end_time': self.showtime.end_date_str,
-            'link': self.gcal_link()
         }
+        if link:
+            json['link'] = self.gcal_link()
+        return json
 
     def gcal_link(self):
-        qs = build_querystring(
-            text = f"Cinema: {self.showtime.movie.title}",
-            dates = self.showtime.start_end_utc_string,
-            details = self.showtime.movie.synopsis,
-            location = self.cinema.address_str,
+        prefix, suffix = _gcal_link_parts(
+            self.showtime.movie.title,
+            self.showtime.movie.synopsis,
+            self.cinema.address_str,
         )
-        return f'{GCAL_BASE_URL}&{qs}'
\ No newline at end of file
+        # The dates (ex: 20200304T140000/20200304T154500) need no quoting
+        return prefix + self.showtime.start_end_utc_string + suffix
+
+
+@lru_cache(maxsize=1024)
+def _gcal_link_parts(title, synopsis, location):
+    """The parts of the link before and after the dates, which only depend on
+    the movie and the cinema : the synopsis is quoted once, not once per showtime"""
+    prefix = f'{GCAL_BASE_URL}&{build_querystring(text=f"Cinema: {title}")}&dates='
+    suffix = '&' + build_querystring(details=synopsis, location=location)
+    return prefix, suffix
@@ -1,10 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from typing import List
+from typing import List, Optional
 
 from .memberships import MemberCard
 from .movies import MovieVersion
-from .showtimes import Showtime, build_program_str, get_showtimes_of_a_day
+from .showtimes import Showtime, ShowtimeIndex, build_program_str
 
 
 @dataclass
@@ -16,6 +16,10 @@ class Cinema:
     zipcode: str
     city: str
     member_cards: List[MemberCard]
+    # Built on first use, and again when the showtimes change
+    _index: Optional[ShowtimeIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def toJSON(self):
         return {
@@ -33,39 +37,35 @@ class Cinema:
         address_str += f"{self.zipcode} {self.city}"
         return address_str
 
+    @property
+    def showtime_index(self) -> ShowtimeIndex:
+        if self._index is None or self._index.showtimes is not self.showtimes:
+            self._index = ShowtimeIndex(self.showtimes)
+        return self._index
+
     def get_showtimes_of_a_movie(self, movie_version: MovieVersion, date: date = None):
-        movie_showtimes = [
-            showtime for showtime in self.showtimes if showtime.movie == movie_version
-        ]
         if date:
-            return [showtime for showtime in movie_showtimes if showtime.date == date]
+            movie_showtimes = self.showtime_index.per_date_and_movie_version.get(
+                (date, movie_version), []
+            )
         else:
-            return movie_showtimes
+            movie_showtimes = self.showtime_index.per_movie_version.get(movie_version, [])
+        return list(movie_showtimes)
 
     def get_showtimes_of_a_day(self, date: date):
-        return get_showtimes_of_a_day(showtimes=self.showtimes, date=date)
+        return list(self.showtime_index.per_date.get(date, []))
 
     def get_movies_available_for_a_day(self, date: date):
         """Returns a list of movies available on a specified day"""
-        movies = [showtime.movie for showtime in self.get_showtimes_of_a_day(date)]
-        return list(set(movies))
+        return list(self.showtime_index.movie_versions_per_date.get(date, []))
 
     def get_showtimes_per_movie_version(self):
-        movies = {}
-        for showtime in self.showtimes:
-            if movies.get(showtime.movie) is None:
-                movies[showtime.movie] = []
-            movies[showtime.movie].append(showtime)
-        return movies
+        """Returns the showtimes per movie version (the dict is cached, do not modify it)"""
+        return self.showtime_index.per_movie_version
 
     def get_showtimes_per_movie(self):
-        movies = {}
-        for showtime in self.showtimes:
-            movie = showtime.movie.get_movie()  # Without language nor screen_format
-            if movies.get(movie) is None:
-                movies[movie] = []
-            movies[movie].append(showtime)
-        return movies
+        """Returns the showtimes per movie (the dict is cached, do not modify it)"""
+        return self.showtime_index.per_movie
 
     def get_program_per_movie(self):
         program_per_movie = {}
@@ -78,6 +78,7 @@ class Cinema:
             self.showtimes = [s for s in self.showtimes if s.date >= date_min]
         if date_max:
             self.showtimes = [s for s in self.showtimes if s.date <= date_max]
+        self._index = None
 
     def __eq__(self, other):
         return (self.allocine_id) == (other.allocine_id)
@@ -85,3 +86,23 @@ class Cinema:
     def __hash__(self):
         """This function allows us to do a set(list_of_Theaters_objects)"""
         return hash(self.allocine_id)
+
+
+class LazyCinema(Cinema):
+    """Cinema whose member cards are loaded on first access, with `load_member_cards()`"""
+
+    def __init__(self, load_member_cards, **fields):
+        super().__init__(member_cards=None, **fields)
+        self._load_member_cards = load_member_cards
+
+    @property
+    def member_cards(self) -> List[MemberCard]:
+        if self._load_member_cards is not None:
+            self._member_cards = self._load_member_cards()
+            self._load_member_cards = None
+        return self._member_cards
+
+    @member_cards.setter
+    def member_cards(self, member_cards: List[MemberCard]):
+        self._member_cards = member_cards
+        self._load_member_cards = None
@@ -0,0 +1,153 @@
+"""Columnar store of the showtimes of a whole region.
+
+Each showtime is a row of 4 integer columns (start minute, end minute,
+cinema index, movie version index), so that the time-window filters run as
+masks over the whole region instead of a Python call per showtime. Only the
+matching rows are materialized, around the Showtime objects of the cinemas.
+The masks are computed with NumPy when it is installed (pip install allocine[numpy]),
+and with plain list comprehensions otherwise, over the rows of the requested day.
+"""
+
+from array import array
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from helpers.schedules import MINUTES_PER_DAY, datetime_to_minutes
+from .aggregation import ShowtimeWithCinema
+from .cinemas import Cinema
+from .movies import MovieVersion
+from .showtimes import Showtime
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+NO_END = -1  # end_minutes value of the showtimes without a duration
+
+
+class ShowtimeColumns:
+    def __init__(self, use_numpy: Optional[bool] = None):
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        if self.use_numpy and np is None:
+            raise ImportError("numpy is required for use_numpy=True")
+        self.cinemas: List[Cinema] = []
+        self.movie_versions: List[MovieVersion] = []
+        self.showtimes: List[Showtime] = []  # The parsed showtime of each row
+        self.start_minutes = array("l")
+        self.end_minutes = array("l")
+        self.cinema_indexes = array("L")
+        self.movie_version_indexes = array("L")
+        self._movie_version_indexes: Dict[MovieVersion, int] = {}
+        self._rows_by_day: Dict[int, array] = {}  # Day since the epoch -> its rows
+        self._arrays = None  # NumPy views of the columns, built on first use
+
+    @classmethod
+    def from_cinemas(cls, cinemas: List[Cinema], use_numpy: Optional[bool] = None):
+        columns = cls(use_numpy=use_numpy)
+        for cinema in cinemas:
+            columns.add_cinema(cinema)
+        return columns
+
+    def add_cinema(self, cinema: Cinema):
+        cinema_index = len(self.cinemas)
+        self.cinemas.append(cinema)
+        for showtime in cinema.showtimes:
+            day = showtime.start_minute // MINUTES_PER_DAY
+            if day not in self._rows_by_day:
+                self._rows_by_day[day] = array("L")
+            self._rows_by_day[day].append(len(self.showtimes))
+            self.showtimes.append(showtime)
+            self.start_minutes.append(showtime.start_minute)
+            self.end_minutes.append(
+                showtime.end_minute if showtime.end_minute is not None else NO_END
+            )
+            self.cinema_indexes.append(cinema_index)
+            self.movie_version_indexes.append(self._index_of(showtime.movie))
+        self._arrays = None
+
+    def _index_of(self, movie_version: MovieVersion) -> int:
+        """The equal movie versions of several cinemas share the same index"""
+        index = self._movie_version_indexes.get(movie_version)
+        if index is None:
+            index = self._movie_version_indexes[movie_version] = len(self.movie_versions)
+            self.movie_versions.append(movie_version)
+        return index
+
+    def __len__(self):
+        return len(self.start_minutes)
+
+    # === Filters ===
+    def select(
+        self,
+        date: Optional[date] = None,
+        starts_after: Optional[datetime] = None,
+        ends_before: Optional[datetime] = None,
+        movie_version: Optional[MovieVersion] = None,
+    ) -> List[int]:
+        """Returns the rows starting on `date`, strictly after `starts_after`,
+        and ending strictly before `ends_before` (or without a known end)"""
+        movie_version_index = None
+        if movie_version is not None:
+            movie_version_index = self._movie_version_indexes.get(movie_version)
+            if movie_version_index is None:
+                return []
+        day_start = day_end = start_min = end_max = None
+        if date is not None:
+            day_start = datetime_to_minutes(datetime.combine(date, time()))
+            day_end = day_start + MINUTES_PER_DAY
+        if starts_after is not None:
+            start_min = datetime_to_minutes(starts_after)
+        if ends_before is not None:
+            end_max = datetime_to_minutes(ends_before)
+
+        if self.use_numpy:
+            return self._select_numpy(day_start, day_end, start_min, end_max, movie_version_index)
+        return self._select_lists(day_start, day_end, start_min, end_max, movie_version_index)
+
+    def _select_numpy(self, day_start, day_end, start_min, end_max, movie_version_index):
+        if self._arrays is None:
+            self._arrays = tuple(
+                np.array(column, dtype=column.typecode)
+                for column in (self.start_minutes, self.end_minutes, self.movie_version_indexes)
+            )
+        starts, ends, movie_version_indexes = self._arrays
+        mask = np.ones(len(starts), dtype=bool)
+        if day_start is not None:
+            mask &= (starts >= day_start) & (starts < day_end)
+        if start_min is not None:
+            mask &= starts > start_min
+        if end_max is not None:
+            mask &= (ends < end_max) | (ends == NO_END)
+        if movie_version_index is not None:
+            mask &= movie_version_indexes == movie_version_index
+        return np.flatnonzero(mask).tolist()
+
+    def _select_lists(self, day_start, day_end, start_min, end_max, movie_version_index):
+        starts, ends = self.start_minutes, self.end_minutes
+        if day_start is not None:
+            rows = self._rows_by_day.get(day_start // MINUTES_PER_DAY, ())
+        else:
+            rows = range(len(starts))
+        if start_min is not None:
+            rows = [row for row in rows if starts[row] > start_min]
+        if end_max is not None:
+            rows = [row for row in rows if ends[row] < end_max or ends[row] == NO_END]
+        if movie_version_index is not None:
+            indexes = self.movie_version_indexes
+            rows = [row for row in rows if indexes[row] == movie_version_index]
+        return list(rows)
+
+    # === Materialization ===
+    def showtime(self, row: int) -> ShowtimeWithCinema:
+        return ShowtimeWithCinema(
+            cinema=self.cinemas[self.cinema_indexes[row]], showtime=self.showtimes[row]
+        )
+
+    def filter(self, **criteria) -> List[ShowtimeWithCinema]:
+        """Same criteria as `select`, only the matching rows are materialized"""
+        cinemas, cinema_indexes, showtimes = self.cinemas, self.cinema_indexes, self.showtimes
+        return [
+            ShowtimeWithCinema(cinema=cinemas[cinema_indexes[row]], showtime=showtimes[row])
+            for row in self.select(**criteria)
+        ]
@@ -11,6 +11,21 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class Movie:
+    __slots__ = (
+        "movie_id",
+        "title",
+        "original_title",
+        "rating",
+        "duration",
+        "genres",
+        "countries",
+        "directors",
+        "actors",
+        "synopsis",
+        "year",
+        "poster",
+    )
+
     movie_id: int
     title: str
     original_title: str
@@ -89,6 +104,8 @@ def _strfdelta(tdelta, fmt):
 
 @dataclass
 class MovieVersion(Movie):
+    __slots__ = ("language", "screen_format")
+
     language: str
     screen_format: str
 
@@ -144,3 +161,40 @@ class MovieVersion(Movie):
         """This function allows us
         to do a set(list_of_MovieVersion_objects)"""
         return hash((self.movie_id, self.version))
+
+
+# Fields of the /movie payload (the other ones are in the showtimelist payload)
+DETAIL_FIELDS = (
+    "original_title",
+    "genres",
+    "countries",
+    "directors",
+    "actors",
+    "synopsis",
+    "year",
+)
+
+
+class LazyMovieVersion(MovieVersion):
+    """MovieVersion whose detail fields (DETAIL_FIELDS) are loaded on first access,
+    with `load_details()`, which returns them as a dict"""
+
+    __slots__ = ("_load_details",)
+
+    def __init__(self, load_details, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self._load_details = load_details
+
+    def __getattr__(self, name):
+        # Only called for the attributes that are not set yet
+        if name in DETAIL_FIELDS and self._load_details is not None:
+            for field_name, value in self._load_details().items():
+                setattr(self, field_name, value)
+            self._load_details = None
+            return getattr(self, name)
+        raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+
+    @property
+    def details_loaded(self) -> bool:
+        return self._load_details is None
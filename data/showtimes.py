@@ -1,13 +1,43 @@
-from dataclasses import dataclass
-from datetime import date
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional
 
-from helpers.schedules import Schedule, build_weekly_schedule_str
+from helpers.schedules import Schedule, build_weekly_schedule_str, datetime_to_minutes
 from .movies import MovieVersion
 
-@dataclass
 class Showtime(Schedule):
-    movie: MovieVersion
+    """A schedule of a movie version. `end_time` is None when the duration is unknown"""
+
+    __slots__ = ("movie",)
+
+    def __init__(self, date_time: datetime, end_time: Optional[datetime], movie: MovieVersion):
+        self.start_minute = datetime_to_minutes(date_time)
+        self.end_minute = datetime_to_minutes(end_time) if end_time is not None else None
+        self.movie = movie
+
+    @classmethod
+    def from_minutes(cls, start_minute: int, end_minute: Optional[int], movie: MovieVersion):
+        showtime = cls.__new__(cls)
+        showtime.start_minute = start_minute
+        showtime.end_minute = end_minute
+        showtime.movie = movie
+        return showtime
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.start_minute, self.end_minute, self.movie) == (
+            other.start_minute,
+            other.end_minute,
+            other.movie,
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"Showtime(date_time={self.date_time!r}, end_time={self.end_time!r}, "
+            f"movie={self.movie!r})"
+        )
 
     def __str__(self):
         return f"{self.date_str} : {self.movie}"
@@ -16,6 +46,37 @@ class Showtime(Schedule):
         raise Exception('Showtimes should not be converted directly to JSON')
 
 
+class ShowtimeIndex:
+    """Showtimes grouped by date and by movie version, built in a single pass"""
+
+    def __init__(self, showtimes: List[Showtime]):
+        self.showtimes = showtimes
+        self.per_date = {}
+        self.per_movie_version = {}
+        self.per_date_and_movie_version = {}
+        for showtime in showtimes:
+            showtime_date = showtime.date
+            self.per_date.setdefault(showtime_date, []).append(showtime)
+            self.per_movie_version.setdefault(showtime.movie, []).append(showtime)
+            self.per_date_and_movie_version.setdefault(
+                (showtime_date, showtime.movie), []
+            ).append(showtime)
+        self.movie_versions_per_date = {}
+        for showtime_date, movie_version in self.per_date_and_movie_version:
+            self.movie_versions_per_date.setdefault(showtime_date, []).append(movie_version)
+        self._per_movie = None
+
+    @property
+    def per_movie(self):
+        """Showtimes grouped by movie (without language nor screen_format)"""
+        if self._per_movie is None:
+            movies = {mv: mv.get_movie() for mv in self.per_movie_version}
+            self._per_movie = {}
+            for showtime in self.showtimes:
+                self._per_movie.setdefault(movies[showtime.movie], []).append(showtime)
+        return self._per_movie
+
+
 def get_showtimes_of_a_day(showtimes: List[Showtime], *, date: date):
     return [showtime for showtime in showtimes if showtime.date == date]
 
@@ -1,14 +1,57 @@
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 import re
 import unicodedata
+from typing import List
 
 from allocine.constants import DEFAULT_DATE_FORMAT
+from helpers.schedules import MINUTES_PER_DAY, datetime_to_minutes
 
 
 def str_datetime_to_datetime_obj(datetime_str, date_format=DEFAULT_DATE_FORMAT):
     return datetime.strptime(datetime_str, date_format)
 
 
+def day_hours_to_minutes(day_str: str, hour_strs: List[str]) -> List[int]:
+    """Minutes since the epoch of the showtimes of a day ("scr" entry),
+    without building and parsing a datetime string per showtime.
+    Falls back to str_datetime_to_datetime_obj for unexpected formats.
+    > day_hours_to_minutes("1970-01-02", ["00:30", "14:00"])
+    [1470, 2280]
+    """
+    try:
+        day_minute = _day_to_minutes(day_str)
+        return [day_minute + _hour_to_minutes(hour_str) for hour_str in hour_strs]
+    except (TypeError, ValueError):
+        return [
+            datetime_to_minutes(str_datetime_to_datetime_obj(f"{day_str}T{hour_str}:00"))
+            for hour_str in hour_strs
+        ]
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=256)
+def _day_to_minutes(day_str: str) -> int:
+    """> _day_to_minutes("1970-01-02")
+    1440
+    """
+    return (date.fromisoformat(day_str).toordinal() - _EPOCH_ORDINAL) * MINUTES_PER_DAY
+
+
+@lru_cache(maxsize=None)  # At most 24 * 60 valid hours
+def _hour_to_minutes(hour_str: str) -> int:
+    """> _hour_to_minutes("14:05")
+    845
+    """
+    hours, minutes = hour_str.split(":")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid hour {hour_str!r}")
+    return hours * 60 + minutes
+
+
 def _cleanhtml(raw_html):
     cleanr = re.compile("<.*?>")
     cleantext = re.sub(cleanr, "", raw_html)
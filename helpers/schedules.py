@@ -1,4 +1,3 @@
-from dataclasses import dataclass
 from datetime import datetime, timedelta, date, time
 from collections import OrderedDict
 from typing import List, Optional
@@ -10,22 +9,72 @@ from helpers.timing import (
     to_french_short_weekday,
 )
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_ONE_MINUTE = timedelta(minutes=1)
+MINUTES_PER_DAY = 24 * 60
+
+
+def datetime_to_minutes(date_time: datetime) -> int:
+    """Number of minutes since 1970-01-01 (naive datetimes, seconds are dropped)
+    > datetime_to_minutes(datetime(1970, 1, 2, 0, 30))
+    1470
+    """
+    return (date_time - _EPOCH) // _ONE_MINUTE
+
+
+def minutes_to_datetime(minutes: int) -> datetime:
+    return _EPOCH + timedelta(minutes=minutes)
+
+
+def minutes_to_date(minutes: int) -> date:
+    return date.fromordinal(_EPOCH_ORDINAL + minutes // MINUTES_PER_DAY)
+
+
 class Schedule:
-    date_time: datetime
-    end_time: datetime
+    """Start and end of a schedule, stored as minutes since the epoch
+    (2 ints per instance, and no __dict__)"""
+
+    __slots__ = ("start_minute", "end_minute")
 
     def __init__(self, date_time: datetime, end_time: Optional[datetime] = None):
-        self.date_time = date_time
-        self.end_time = end_time if end_time is not None else date_time + timedelta(minutes=15)
+        self.start_minute = datetime_to_minutes(date_time)
+        self.end_minute = (
+            datetime_to_minutes(end_time)
+            if end_time is not None
+            else self.start_minute + 15
+        )
+
+    @property
+    def date_time(self) -> datetime:
+        return minutes_to_datetime(self.start_minute)
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        if self.end_minute is None:
+            return None
+        return minutes_to_datetime(self.end_minute)
 
     @property
     def date(self) -> date:
-        return self.date_time.date()
+        return minutes_to_date(self.start_minute)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.start_minute, self.end_minute) == (
+            other.start_minute,
+            other.end_minute,
+        )
+
+    __hash__ = None  # Mutable, like the former dataclass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(date_time={self.date_time!r}, end_time={self.end_time!r})"
 
     @property
     def hour(self) -> datetime.time:
-        return self.date_time.time()
+        return time(*divmod(self.start_minute % MINUTES_PER_DAY, 60))
 
     @property
     def hour_str(self) -> str:
@@ -3,6 +3,7 @@
 
 """CLI tool for allocine"""
 import click
+from allocine.cache import ResponseCache
 from app.main import get_showings
 
 # Usage : seances.py --help
@@ -49,7 +50,12 @@ from app.main import get_showings
 @click.option(
     "--format",
     type=str,
-    help="default, or json",
+    help="default, json, or ndjson (une ligne par cinéma)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="réutilise les réponses récentes d'Allociné (stockées dans ~/.cache/allocine)",
 )
 def main(
     id_cinema,
@@ -59,7 +65,8 @@ def main(
     card=None,
     earliest_time=None,
     latest_time=None,
-    format=None
+    format=None,
+    cache=True,
 ):
     showings = get_showings(
         id_cinema,
@@ -69,10 +76,14 @@ def main(
         card,
         earliest_time,
         latest_time,
-        format
+        format,
+        cache=ResponseCache() if cache else None,
     )
     for showing in showings:
-        print(showing)
+        if format == "ndjson":  # Already one line per cinema
+            print(showing, end="", flush=True)
+        else:
+            print(showing)
 
 if __name__ == "__main__":
     main()
@@ -26,7 +26,7 @@ _SCRIPTS = ["seances.py"]
 
 setup(
     name="allocine",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "tests"]),
     package_data={},
     scripts=_SCRIPTS,
     version=__version__,
@@ -43,6 +43,10 @@ setup(
     keywords=_KEYWORDS,
     setup_requires=requirements,
     install_requires=requirements,
+    extras_require={
+        "numpy": ["numpy"],  # Vectorized filters of data.columnar
+        "orjson": ["orjson"],  # Faster JSON serialization of app.formatting
+    },
     classifiers=[
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""Offline fixtures : fake Allociné payloads and a fake client serving them."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.cinemas import Cinema
+from data.movies import MovieVersion
+from data.showtimes import Showtime
+
+
+def make_raw_movie_showtime(movie_id, title, days, language="Français", runtime=5400):
+    return {
+        "onShow": {
+            "movie": {
+                "code": movie_id,
+                "title": title,
+                "runtime": runtime,
+                "statistics": {"userRating": 3.5},
+                "poster": {"href": f"https://example.com/{movie_id}.jpg"},
+            }
+        },
+        "version": {"$": language},
+        "screenFormat": {"$": "Numérique"},
+        "scr": [
+            {"d": day, "t": [{"$": hour} for hour in hours]}
+            for day, hours in days.items()
+        ],
+    }
+
+
+def make_theater_showtimes(code, movie_showtimes, distance=None):
+    theater = {
+        "code": code,
+        "name": f"Cinéma {code}",
+        "address": "1 rue de la Paix",
+        "postalCode": "75001",
+        "city": "Paris",
+    }
+    if distance is not None:
+        theater["distance"] = distance
+    return {"place": {"theater": theater}, "movieShowtimes": movie_showtimes}
+
+
+def make_showtimelist(theater_showtimes, total_results=None):
+    if total_results is None:
+        total_results = len(theater_showtimes)
+    return {"feed": {"totalResults": total_results, "theaterShowtimes": theater_showtimes}}
+
+
+def make_movie_info(movie_id):
+    return {
+        "movie": {
+            "code": movie_id,
+            "originalTitle": f"Original {movie_id}",
+            "productionYear": 2020,
+            "synopsis": "<span>Un</span>\xa0film",
+            "nationality": [{"$": "France"}],
+            "genre": [{"$": "Drame"}, {"$": "Comédie"}],
+            "castingShort": {"directors": "A. Réalisateur", "actors": "B. Acteur"},
+        }
+    }
+
+
+def make_cinema_info(code, cards=((106002, "UGC Illimité"),)):
+    return {"theater": {"code": code, "memberCard": [{"code": c, "label": label} for c, label in cards]}}
+
+
+def make_movie_version(movie_id, language="Français"):
+    return MovieVersion(
+        movie_id=movie_id,
+        title=f"Film {movie_id}",
+        original_title=None,
+        rating=None,
+        duration=timedelta(minutes=90),
+        genres="",
+        countries=None,
+        directors=None,
+        actors=None,
+        synopsis=None,
+        year=None,
+        poster=None,
+        language=language,
+        screen_format="Numérique",
+    )
+
+
+def make_cinema():
+    vf, vost, other = make_movie_version(1), make_movie_version(1, "Anglais"), make_movie_version(2)
+    showtimes = [
+        Showtime(date_time=datetime(2020, 3, 4, 14, 0), end_time=None, movie=vf),
+        Showtime(date_time=datetime(2020, 3, 4, 20, 0), end_time=None, movie=vost),
+        Showtime(date_time=datetime(2020, 3, 5, 14, 0), end_time=None, movie=vf),
+        Showtime(date_time=datetime(2020, 3, 5, 16, 0), end_time=None, movie=other),
+    ]
+    cinema = Cinema(
+        allocine_id="P0001",
+        name="Cinéma",
+        showtimes=showtimes,
+        address=None,
+        zipcode="75001",
+        city="Paris",
+        member_cards=[],
+    )
+    return cinema, vf, vost, other
+
+
+class FakeClient:
+    """Stand-in for :class:`allocine.client.Client`, serving in-memory payloads.
+
+    Every call is recorded in `calls`, and `max_in_flight` keeps the highest
+    number of calls that were running at the same time.
+    """
+
+    def __init__(self, theaters, delay=0.0):
+        self.theaters = {t["place"]["theater"]["code"]: t for t in theaters}
+        self.delay = delay
+        self.calls = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, name, arg, payload):
+        with self._lock:
+            self.calls.append((name, arg))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return payload
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get_showtimelist_by_cinema_id(self, allocine_cinema_id, page=1, count=10):
+        theater = self.theaters.get(allocine_cinema_id)
+        payload = make_showtimelist([theater] if theater else [])
+        return self._call("showtimelist", allocine_cinema_id, payload)
+
+    def get_showtimelist_by_cinema_ids(self, allocine_cinema_ids, page=1, count=10):
+        theaters = [self.theaters[i] for i in allocine_cinema_ids if i in self.theaters]
+        page_theaters = theaters[(page - 1) * count:page * count]
+        payload = make_showtimelist(page_theaters, total_results=len(theaters))
+        return self._call("showtimelist", (tuple(allocine_cinema_ids), page), payload)
+
+    def get_showtimelist_from_geocode(self, geocode, page=1, count=10):
+        theaters = list(self.theaters.values())
+        page_theaters = theaters[(page - 1) * count:page * count]
+        payload = make_showtimelist(page_theaters, total_results=len(theaters))
+        return self._call("geocode", (geocode, page), payload)
+
+    def get_cinema_info_by_id(self, allocine_cinema_id):
+        return self._call("theater", allocine_cinema_id, make_cinema_info(allocine_cinema_id))
+
+    def get_movie_info_by_id(self, movie_id):
+        return self._call("movie", movie_id, make_movie_info(movie_id))
+
+    def count(self, name):
+        return len([call for call in self.calls if call[0] == name])
+
+
+@pytest.fixture
+def theaters():
+    days = {"2020-03-04": ["14:00", "20:30"], "2020-03-05": ["18:15"]}
+    return [
+        make_theater_showtimes(
+            "P0001",
+            [
+                make_raw_movie_showtime(1001, "Film A", days),
+                make_raw_movie_showtime(1002, "Film B", days, language="Anglais"),
+                make_raw_movie_showtime(1003, "Film C", days),
+            ],
+        ),
+        make_theater_showtimes(
+            "P0002",
+            [
+                make_raw_movie_showtime(1001, "Film A", days),
+                make_raw_movie_showtime(1004, "Film D", days),
+            ],
+        ),
+    ]
+
+
+@pytest.fixture
+def fake_client(theaters):
+    return FakeClient(theaters)
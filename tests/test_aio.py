@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the asyncio facade (offline, with a fake client)."""
+
+# To be tested with : python3 -m pytest -vs tests/test_aio.py
+
+import asyncio
+
+import pytest
+
+from allocine import Allocine, AsyncAllocine, MovieCache
+from conftest import FakeClient
+
+
+def test_async_get_cinema(fake_client):
+    allocine = AsyncAllocine(client=fake_client, movie_cache=MovieCache())
+    cinema = asyncio.run(allocine.get_cinema("P0001"))
+
+    assert cinema.allocine_id == "P0001"
+    assert len(cinema.showtimes) == 9
+    assert cinema.member_cards[0]["code"] == 106002
+    assert fake_client.count("movie") == 3
+    assert fake_client.count("theater") == 1
+
+
+def test_movie_infos_are_fetched_concurrently(theaters):
+    fake_client = FakeClient(theaters, delay=0.05)
+    allocine = AsyncAllocine(client=fake_client, max_concurrency=2, movie_cache=MovieCache())
+    asyncio.run(allocine.get_cinema("P0001"))
+
+    # 1 theater + 3 movies, but never more than 2 at once
+    assert fake_client.max_in_flight == 2
+
+
+def test_sync_reuses_movie_store(fake_client):
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache())
+    allocine.get_cinema("P0001")
+    allocine.get_cinema("P0002")
+
+    # Film A is shared by both cinemas
+    assert fake_client.count("movie") == 4
+
+
+def test_sync_errors(fake_client):
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache())
+    with pytest.raises(ValueError):
+        allocine.get_cinema("UNKNOWN")
+
+
+def test_sync_prefetch_is_bounded(theaters):
+    fake_client = FakeClient(theaters, delay=0.05)
+    allocine = Allocine(client=fake_client, max_concurrency=3, movie_cache=MovieCache())
+    cinema = allocine.get_cinema("P0001")
+
+    assert len(cinema.showtimes) == 9
+    assert fake_client.max_in_flight == 3
+
+
+def test_async_gather_several_cinemas(fake_client):
+    allocine = AsyncAllocine(client=fake_client, movie_cache=MovieCache())
+
+    async def get_both():
+        return await asyncio.gather(
+            allocine.get_cinema("P0001"), allocine.get_cinema("P0002")
+        )
+
+    cinemas = asyncio.run(get_both())
+    assert [c.allocine_id for c in cinemas] == ["P0001", "P0002"]
+
+
+def test_movie_cache_is_shared_between_instances(fake_client):
+    movie_cache = MovieCache()
+    Allocine(client=fake_client, movie_cache=movie_cache).get_cinema("P0001")
+    Allocine(client=fake_client, movie_cache=movie_cache).get_cinema("P0001")
+
+    assert fake_client.count("movie") == 3
+    assert movie_cache.stats()["entries"] == 3
+
+
+def test_iter_cinemas_cancelled_during_a_page(theaters):
+    fake_client = FakeClient(theaters, delay=0.05)
+    allocine = AsyncAllocine(client=fake_client, movie_cache=MovieCache(), page_size=1)
+
+    async def cancel_second_cinema():
+        cinemas = allocine.iter_cinemas(83165, lookahead=1)
+        assert (await cinemas.__anext__()).allocine_id == "P0001"
+        task = asyncio.ensure_future(cinemas.__anext__())
+        await asyncio.sleep(0.02)  # next() is running in the executor
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):  # Not "generator already executing"
+            await task
+
+    asyncio.run(cancel_second_cinema())
@@ -5,12 +5,37 @@
 
 # To be tested with : python3 -m pytest -vs tests/test_allocine.py
 
+import os
+from pathlib import Path
+
 import pytest
-from allocine import Allocine
+from allocine import Allocine, MovieCache
+from allocine.client import Client
+from allocine.constants import BASE_URL
+from allocine.replay import FixtureStore, RecordingTransport, ReplayTransport
+from allocine.transport import RequestsTransport
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "allocine"
+
+
+@pytest.fixture
+def allocine():
+    """The live API with ALLOCINE_LIVE_TESTS=1. Otherwise the responses recorded in
+    ALLOCINE_FIXTURES=<directory> (record them first with ALLOCINE_RECORD=1, with
+    network access), by default those of tests/fixtures/allocine (a synthetic P0645)"""
+    if os.environ.get("ALLOCINE_LIVE_TESTS"):
+        return Allocine()
+    store = FixtureStore(os.environ.get("ALLOCINE_FIXTURES") or FIXTURES)
+    if os.environ.get("ALLOCINE_RECORD"):
+        transport = RecordingTransport(RequestsTransport(), store)
+    else:
+        transport = ReplayTransport(store)
+    client = Client(BASE_URL, transport=transport, shared=False)
+    return Allocine(client=client, movie_cache=MovieCache())
 
 
-def test_class_Cinema():
-    allocine = Allocine()
+def test_class_Cinema(allocine):
     cinema = allocine.get_cinema(allocine_cinema_id="P0645")
     assert len(cinema.showtimes) > 0
 
@@ -19,7 +44,6 @@ def test_class_Cinema():
     assert len(movies) > 0
 
 
-def test_class_Allocine_errors():
-    allocine = Allocine()
+def test_class_Allocine_errors(allocine):
     with pytest.raises(ValueError):
         allocine.get_cinema(allocine_cinema_id="UNKOWN")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the persistent response cache."""
+
+# To be tested with : python3 -m pytest -vs tests/test_cache.py
+
+import threading
+import time
+from datetime import timedelta
+
+from allocine import Allocine
+from allocine.cache import MovieCache, ResponseCache, canonical_url, get_endpoint
+from allocine.client import Client
+
+MOVIE_URL = "http://api.allocine.fr/rest/v3/movie?partner=1&format=json&code=42"
+SHOWTIMELIST_URL = "http://api.allocine.fr/rest/v3/showtimelist?partner=1&theaters=P0645"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_canonical_url():
+    assert canonical_url(MOVIE_URL) == canonical_url(
+        "http://api.allocine.fr/rest/v3/movie?code=42&format=json&partner=1"
+    )
+    assert get_endpoint(MOVIE_URL) == "movie"
+
+
+def test_cache_persists_between_instances(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    ResponseCache(path).set(MOVIE_URL, {"movie": {"code": 42}})
+
+    cache = ResponseCache(path)
+    assert cache.get(MOVIE_URL) == {"movie": {"code": 42}}
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_ttl_per_endpoint(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(tmp_path / "responses.sqlite", clock=clock)
+    cache.set(MOVIE_URL, {"movie": {}})
+    cache.set(SHOWTIMELIST_URL, {"feed": {}})
+
+    clock.now += timedelta(hours=2).total_seconds()
+    assert cache.get(MOVIE_URL) == {"movie": {}}
+    assert cache.get(SHOWTIMELIST_URL) is None  # Expired after 1 hour
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_cache_disabled_endpoint(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite", ttls={"showtimelist": None})
+    assert cache.set(SHOWTIMELIST_URL, {"feed": {}}) is False
+    assert cache.get(SHOWTIMELIST_URL) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_bytes=120, clock=clock)
+    for code in range(3):
+        clock.now += 1
+        cache.set(f"{MOVIE_URL}{code}", {"synopsis": "x" * 20})
+    clock.now += 1
+    cache.get(f"{MOVIE_URL}0")  # 0 is now more recent than 1
+    clock.now += 1
+    cache.set(f"{MOVIE_URL}3", {"synopsis": "x" * 20})
+
+    assert cache.get(f"{MOVIE_URL}1") is None
+    assert cache.get(f"{MOVIE_URL}0") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_movie_cache_lru_and_ttl():
+    clock = FakeClock()
+    cache = MovieCache(max_entries=2, ttl=timedelta(minutes=10), clock=clock)
+    cache.set(1, {"code": 1})
+    cache.set(2, {"code": 2})
+    cache.get(1)  # 2 is now the least recently used
+    cache.set(3, {"code": 3})
+
+    assert cache.get(2) is None
+    assert cache.get(1) == {"code": 1}
+
+    clock.now += timedelta(minutes=11).total_seconds()
+    assert cache.get(3) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 1)
+
+
+def test_movie_cache_bounded_by_size():
+    cache = MovieCache(max_bytes=100)
+    cache.set(1, {"synopsis": "x" * 30})  # 45 bytes of JSON
+    cache.set(2, {"synopsis": "x" * 30})
+    cache.set(3, {"synopsis": "x" * 30})
+
+    assert 1 not in cache
+    assert len(cache) == 2
+    assert cache.stats()["size_bytes"] == 90
+    cache.set(2, {"synopsis": ""})  # Replaced, not counted twice
+    assert cache.stats()["size_bytes"] == 60
+
+
+class MovieTransport:
+    """Transport whose response is itself"""
+
+    status_code = 200
+
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return self
+
+    def json(self):
+        return {"movie": {"code": 42}}
+
+
+def test_caches_of_two_allocine_instances_do_not_leak():
+    transport = MovieTransport()
+    client = Client(base_url="http://api.allocine.fr/rest/v3", transport=transport, shared=False)
+    first_cache, second_cache = ResponseCache(":memory:"), ResponseCache(":memory:")
+    Allocine(client=client, cache=first_cache, movie_cache=MovieCache()).get_movie_info(42)
+    Allocine(client=client, cache=second_cache, movie_cache=MovieCache()).get_movie_info(42)
+    Allocine(client=client, movie_cache=MovieCache()).get_movie_info(42)
+
+    assert client.cache is None
+    assert first_cache.stats()["stores"] == second_cache.stats()["stores"] == 1
+    assert len(transport.urls) == 3  # Neither cache was used by the other instances
+
+
+class BlockingMovieTransport(MovieTransport):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def get(self, url, **kwargs):
+        response = super().get(url, **kwargs)
+        self.release.wait(5)
+        return response
+
+
+def test_concurrent_cached_allocine_instances_share_the_requests():
+    transport = BlockingMovieTransport()
+    client = Client(base_url="http://api.allocine.fr/rest/v3", transport=transport, shared=False)
+    cache = ResponseCache(":memory:")
+    instances = [Allocine(client=client, cache=cache, movie_cache=MovieCache()) for _ in range(5)]
+    threads = [threading.Thread(target=instance.get_movie_info, args=(42,)) for instance in instances]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if sum(instance._Allocine__client.coalesced for instance in instances) == 4:
+            break
+        time.sleep(0.01)
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(transport.urls) == 1
+    assert sum(instance._Allocine__client.coalesced for instance in instances) == 4
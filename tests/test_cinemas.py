@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the showtimes of a cinema."""
+
+# To be tested with : python3 -m pytest -vs tests/test_cinemas.py
+
+from datetime import date
+
+from conftest import make_cinema
+
+
+def test_showtimes_per_date_and_movie_version():
+    cinema, vf, vost, other = make_cinema()
+
+    assert cinema.get_showtimes_of_a_movie(vf, date(2020, 3, 4)) == [cinema.showtimes[0]]
+    assert cinema.get_showtimes_of_a_movie(vf) == [cinema.showtimes[0], cinema.showtimes[2]]
+    assert cinema.get_movies_available_for_a_day(date(2020, 3, 4)) == [vf, vost]
+    assert cinema.get_showtimes_of_a_day(date(2020, 3, 6)) == []
+
+
+def test_showtimes_per_movie_are_cached():
+    cinema, vf, vost, other = make_cinema()
+
+    per_movie = cinema.get_showtimes_per_movie()
+    assert len(per_movie[vf.get_movie()]) == 3  # VF and VOST
+    assert cinema.get_showtimes_per_movie() is per_movie
+
+
+def test_filter_showtimes_invalidates_the_index():
+    cinema, vf, vost, other = make_cinema()
+    assert len(cinema.get_showtimes_of_a_movie(vf)) == 2
+
+    cinema.filter_showtimes(date_min=date(2020, 3, 5))
+    assert cinema.get_showtimes_of_a_movie(vf) == [cinema.showtimes[0]]
+    assert cinema.get_movies_available_for_a_day(date(2020, 3, 4)) == []
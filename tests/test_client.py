@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the client of the Allociné API (offline, without a real session)."""
+
+# To be tested with : python3 -m pytest -vs tests/test_client.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from allocine.client import Client, Error503
+from allocine.constants import DEFAULT_MAX_RATE
+from allocine.ratelimit import AdaptiveRateLimiter
+from allocine.transport import RequestsTransport
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeTransport:
+    def __init__(self, responses):
+        self.responses = responses  # url part -> FakeResponse
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return next(r for part, r in self.responses.items() if part in url)
+
+
+@pytest.fixture
+def client():
+    return Client(base_url="http://api.allocine.fr/rest/v3", shared=False)
+
+
+def test_isolated_client_with_a_fake_transport():
+    transport = FakeTransport(
+        {"code=1": FakeResponse(200, {"movie": {"code": 1}}), "code=2": FakeResponse(404)}
+    )
+    client = Client(base_url="http://api.allocine.fr/rest/v3", transport=transport, shared=False)
+
+    assert client is not Client(base_url="http://api.allocine.fr/rest/v3")
+    assert client.get_movie_info_by_id(1) == {"movie": {"code": 1}}
+    with pytest.raises(ValueError):
+        client.get_movie_info_by_id(2)
+    assert len(transport.urls) == 2
+
+
+def test_requests_transport_shares_its_pool_between_threads():
+    transport = RequestsTransport(pool_size=4, connect_timeout=1, read_timeout=2)
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(transport.session)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sessions[0] is not sessions[1]
+    assert sessions[0].get_adapter("http://api.allocine.fr") is transport.adapter
+    assert transport.adapter._pool_maxsize == 4
+    assert transport.timeout == (1, 2)
+
+
+def wait_until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise TimeoutError
+
+
+def test_concurrent_calls_are_coalesced(client):
+    release = threading.Event()
+    fetched_urls = []
+
+    def fake_fetch(url, expected_status=200):
+        fetched_urls.append(url)
+        release.wait(5)
+        if "code=2" in url:
+            raise ValueError("Not found")
+        return {"url": url}
+
+    client._fetch = fake_fetch
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for movie_id, coalesced in ((1, 3), (2, 6)):
+            release.clear()
+            futures = [executor.submit(client.get_movie_info_by_id, movie_id)]
+            wait_until(lambda: len(fetched_urls) == movie_id)
+            futures += [executor.submit(client.get_movie_info_by_id, movie_id) for _ in range(3)]
+            wait_until(lambda: client.coalesced == coalesced)
+            release.set()
+            if movie_id == 1:
+                results = [future.result() for future in futures]
+                assert results == [{"url": fetched_urls[0]}] * 4
+            else:
+                for future in futures:  # Every caller gets the error
+                    with pytest.raises(ValueError):
+                        future.result()
+
+    assert client.stats() == {"requests": 2, "coalesced": 6}
+    assert client._in_flight == {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limiter_backs_off_on_503_and_ramps_up():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(
+        rate=8, max_rate=8, concurrency=8, rate_increase=0.5, decrease_interval=10, clock=clock
+    )
+
+    for _ in range(3):  # A storm of 503 only decreases the limits once
+        limiter.acquire()
+        limiter.release(throttled=True)
+        clock.now += 1  # Refills the bucket
+    assert (limiter.rate, limiter.concurrency) == (4, 4)
+
+    clock.now = 10.0
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert (limiter.rate, limiter.concurrency) == (2, 2)
+
+    clock.now += 1
+    limiter.acquire()
+    limiter.release()
+    assert (limiter.rate, limiter.concurrency) == (4, 2.5)  # + 0.5 * 8 per window of 2
+
+    stats = limiter.stats()
+    assert stats["throttled"] == 4
+    assert stats["decreases"] == 2
+    assert stats["requests"] == 5
+    assert stats["in_flight"] == 0
+
+
+def test_rate_limiter_does_not_pace_without_503():
+    limiter = AdaptiveRateLimiter()
+    for _ in range(1000):
+        limiter.acquire()
+        limiter.release()
+    stats = limiter.stats()
+    assert (stats["rate"], stats["waits"], stats["wait_time"]) == (None, 0, 0.0)
+
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.rate == DEFAULT_MAX_RATE / 2  # Paced from the first 503
+
+
+def test_rate_limiter_recovers_additively_up_to_max_rate():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(max_rate=10, rate_increase=0.1, clock=clock)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    rates = [limiter.rate]
+    while limiter.rate < 10:
+        clock.now += 1  # Refills the bucket
+        limiter.acquire()
+        limiter.release()
+        rates.append(limiter.rate)
+    assert rates[:2] == [5, 5.2]  # + 0.1 * 10 per window of 5 successes
+    assert 30 < len(rates) < 50
+    limiter.acquire()
+    limiter.release()
+    assert limiter.rate == 10  # Capped, still paced
+
+
+def test_rate_limiter_bounds_the_requests_in_flight():
+    limiter = AdaptiveRateLimiter(rate=1000, concurrency=2)
+    limiter.acquire()
+    limiter.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    thread.start()
+
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.stats()["waits"] == 1
+
+
+def test_client_reports_503_to_its_rate_limiter():
+    limiter = AdaptiveRateLimiter(rate=1000, concurrency=8)
+    transport = FakeTransport({"code=1": FakeResponse(503)})
+    client = Client(
+        base_url="http://api.allocine.fr/rest/v3",
+        transport=transport,
+        rate_limiter=limiter,
+        shared=False,
+    )
+    with pytest.raises(Error503):  # Without the retries of backoff
+        client._fetch.__wrapped__(client, client.base_url + "/movie?code=1")
+
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.concurrency == 4
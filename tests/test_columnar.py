@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the columnar store of the showtimes of a region."""
+
+# To be tested with : python3 -m pytest -vs tests/test_columnar.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.main import check_showtime_eligibility
+from data import columnar
+from data.cinemas import Cinema
+from data.columnar import ShowtimeColumns
+from data.showtimes import Showtime
+from conftest import make_movie_version
+
+
+def make_cinemas():
+    vf, vost = make_movie_version(1), make_movie_version(1, "Anglais")
+    cinemas = []
+    for code in ("P0001", "P0002"):
+        showtimes = [
+            Showtime(
+                date_time=datetime(2020, 3, day, hour, 0),
+                end_time=datetime(2020, 3, day, hour, 0) + timedelta(minutes=105)
+                if hour != 22
+                else None,
+                movie=movie,
+            )
+            for day in (4, 5)
+            for hour in (11, 14, 20, 22)
+            for movie in (vf, make_movie_version(1, "Anglais"))
+        ]
+        cinemas.append(
+            Cinema(
+                allocine_id=code,
+                name=f"Cinéma {code}",
+                showtimes=showtimes,
+                address=None,
+                zipcode="75001",
+                city="Paris",
+                member_cards=[],
+            )
+        )
+    return cinemas, vf, vost
+
+
+BACKENDS = [False] + ([True] if columnar.np is not None else [])
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_filter_matches_check_showtime_eligibility(use_numpy):
+    cinemas, vf, vost = make_cinemas()
+    columns = ShowtimeColumns.from_cinemas(cinemas, use_numpy=use_numpy)
+    assert len(columns) == 32
+    assert len(columns.movie_versions) == 2  # Shared by the 2 cinemas
+
+    jour = date(2020, 3, 5)
+    results = columns.filter(
+        date=jour,
+        starts_after=datetime(2020, 3, 5, 12, 0),
+        ends_before=datetime(2020, 3, 5, 22, 30),
+    )
+    expected = [
+        (cinema, showtime)
+        for cinema in cinemas
+        for showtime in cinema.showtimes
+        if showtime.date == jour
+        and check_showtime_eligibility(showtime, jour, "12:00", "22:30")
+    ]
+    assert [(r.cinema, r.showtime) for r in results] == expected
+    assert [r.showtime.hour_str for r in results[:6]] == ["14:00", "14:00", "20:00", "20:00", "22:00", "22:00"]
+    assert results[4].showtime.end_time is None
+
+    vost_rows = columns.select(date=jour, movie_version=vost)
+    assert [columns.showtime(row).showtime.movie for row in vost_rows] == [vost] * 8
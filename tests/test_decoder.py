@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the decoding of the raw payloads."""
+
+# To be tested with : python3 -m pytest -vs tests/test_decoder.py
+
+from datetime import datetime
+
+from allocine.decoder import decode_movie_info, decode_showtimelist, decode_theater_info
+from conftest import make_cinema_info, make_movie_info, make_showtimelist
+from helpers.cleaners import day_hours_to_minutes, str_datetime_to_datetime_obj
+from helpers.schedules import datetime_to_minutes, minutes_to_datetime
+
+
+def test_decode_showtimelist(theaters):
+    showtimelist = decode_showtimelist(make_showtimelist(theaters))
+
+    assert showtimelist.total_results == 2
+    record = showtimelist.theater_showtimes[0]
+    assert record.theater.code == "P0001"
+    assert record.theater.postal_code == "75001"
+    movie_showtimes = record.movie_showtimes[1]
+    assert (movie_showtimes.movie_id, movie_showtimes.language) == (1002, "Anglais")
+    assert movie_showtimes.rating == 3.5
+    assert movie_showtimes.days[0] == ("2020-03-04", ["14:00", "20:30"])
+
+
+def test_decode_missing_fields():
+    showtimelist = decode_showtimelist({"feed": {"theaterShowtimes": [{"movieShowtimes": [
+        {"onShow": {"movie": {"code": 1, "statistics": {"userRating": "NaN?"}}},
+         "scr": [None, {"d": "2020-03-04"}]},
+    ]}]}})
+
+    assert showtimelist.total_results == 0
+    movie_showtimes = showtimelist.theater_showtimes[0].movie_showtimes[0]
+    assert movie_showtimes.rating is None
+    assert movie_showtimes.language is None
+    assert movie_showtimes.days == []
+
+
+def test_decode_movie_and_theater_info():
+    movie_info = decode_movie_info(make_movie_info(42)["movie"])
+    assert movie_info.countries == ["France"]
+    assert movie_info.genres == ["Drame", "Comédie"]
+    assert movie_info.year == 2020
+
+    assert decode_movie_info({}).genres == []
+    assert decode_theater_info(make_cinema_info("P0001")).member_cards[0]["code"] == 106002
+
+
+def test_day_hours_to_minutes():
+    hours = ["00:00", "09:05", "14:00", "23:59"]
+    assert day_hours_to_minutes("2020-03-04", hours) == [
+        datetime_to_minutes(str_datetime_to_datetime_obj(f"2020-03-04T{hour}:00"))
+        for hour in hours
+    ]
+    # Unexpected format : parsed by the strptime fallback
+    assert [minutes_to_datetime(m) for m in day_hours_to_minutes("2020-3-4", ["9:5"])] == [
+        datetime(2020, 3, 4, 9, 5)
+    ]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the JSON serialization of the data objects."""
+
+# To be tested with : python3 -m pytest -vs tests/test_formatting.py
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import formatting
+from app.main import DayFilmShowtimes, FilmShowtimesGroup
+from data.aggregation import ShowtimeWithCinema
+from data.showtimes import Showtime
+from conftest import make_cinema
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(formatting, "orjson", None)
+    elif formatting.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_serializer_memoizes_the_movies(backend, monkeypatch):
+    cinema, vf, _, _ = make_cinema()
+    vf.synopsis = "Un film"
+    calls = []
+    to_json = type(vf).toJSON
+    monkeypatch.setitem(
+        formatting._serializers, type(vf), lambda movie: calls.append(movie) or to_json(movie)
+    )
+    monkeypatch.setattr(formatting, "_resolved", {})
+    start = datetime(2020, 3, 4, 14, 0)
+    showtime = Showtime(date_time=start, end_time=start + timedelta(minutes=105), movie=vf)
+    days = [
+        DayFilmShowtimes(
+            day=day,
+            showings=[
+                FilmShowtimesGroup(
+                    film=vf,
+                    showtimes=[ShowtimeWithCinema(cinema=cinema, showtime=showtime)],
+                )
+            ],
+        )
+        for day in ("2020-03-04", "2020-03-05")
+    ]
+
+    body = formatting.Serializer().dumps({"cinema": cinema, "showings": days})
+    assert isinstance(body, bytes)
+    decoded = json.loads(body)
+    assert decoded["cinema"]["allocine_id"] == "P0001"
+    assert [d["showings"][0]["film"]["movie_id"] for d in decoded["showings"]] == [1, 1]
+    assert decoded["showings"][0]["showings"][0]["showtimes"][0]["end_time"] == "2020-03-04 15:45"
+    assert len(calls) == 1  # Built once for the 2 days
+
+
+def test_only_the_movies_are_kept_across_documents(backend):
+    cinema, vf, _, _ = make_cinema()
+    other_cinema, _, _, _ = make_cinema()
+    serializer = formatting.Serializer()
+    first = serializer.dumps({"cinema": cinema, "film": vf})
+    assert json.loads(serializer.dumps({"cinema": other_cinema, "film": vf})) == json.loads(first)
+    assert [kept for kept, _ in serializer._fragments.values()] == [vf]  # The cinemas are not pinned
+    assert serializer._document_fragments == {}
+
+
+def test_showtimes_are_not_serialized_directly(backend):
+    showtime = Showtime(date_time=datetime(2020, 3, 4, 14, 0), end_time=None, movie=None)
+    with pytest.raises(Exception):
+        formatting.Serializer().dumps(showtime)
+
+
+def test_gcal_links_can_be_left_out(backend):
+    cinema, vf, _, _ = make_cinema()
+    vf.synopsis = "Un film : très long"
+    start = datetime(2020, 3, 4, 14, 0)
+    showtime = ShowtimeWithCinema(
+        cinema=cinema,
+        showtime=Showtime(date_time=start, end_time=start + timedelta(minutes=105), movie=vf),
+    )
+    link = json.loads(formatting.Serializer().dumps(showtime))["link"]
+    assert "dates=20200304T140000/20200304T154500&details=Un%20film%20%3A%20tr%C3%A8s%20long" in link
+
+    serializer = formatting.Serializer(
+        {ShowtimeWithCinema: lambda s: ShowtimeWithCinema.toJSON(s, link=False)}
+    )
+    assert json.loads(serializer.dumps(showtime)) == {
+        "start_time": "2020-03-04 14:00",
+        "end_time": "2020-03-04 15:45",
+    }
+
+
+@pytest.mark.parametrize("indent", [True, False])
+def test_iter_array_is_the_json_of_the_list(backend, indent):
+    documents = [{"a": [1, 2], "b": "x\ny"}, {}, {"c": None}]
+    serializer = formatting.Serializer()
+    body = b"".join(serializer.iter_array(iter(documents), indent=indent))
+
+    assert body == serializer.dumps(documents, indent=indent)
+    assert b"".join(serializer.iter_array([], indent=indent)) == b"[]"
+
+
+@pytest.mark.parametrize("indent", [True, False])
+def test_both_backends_give_the_same_bytes(monkeypatch, indent):
+    if formatting.orjson is None:
+        pytest.skip("orjson is not installed")
+    cinema, vf, _, _ = make_cinema()
+    document = {"a": "é", "cinema": cinema, "film": vf, "list": [1, None, {"b": "x\ny"}], "empty": []}
+    with_orjson = formatting.Serializer().dumps(document, indent=indent)
+    monkeypatch.setattr(formatting, "orjson", None)
+    assert formatting.Serializer().dumps(document, indent=indent) == with_orjson
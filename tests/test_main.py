@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the filters of the showings (app.main)."""
+
+# To be tested with : python3 -m pytest -vs tests/test_main.py
+
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from allocine.client import Client
+from allocine.constants import DEFAULT_PAGE_SIZE
+from app.main import ShowtimeFilter, check_showtime_eligibility, get_showings
+from data.showtimes import Showtime
+from conftest import (
+    FakeClient,
+    make_movie_version,
+    make_raw_movie_showtime,
+    make_theater_showtimes,
+)
+
+
+@pytest.mark.parametrize(
+    "earliest_time, latest_time",
+    [(None, None), ("14:00", None), (None, "22:30"), ("11:59", "20:00")],
+)
+def test_showtime_filter_matches_check_showtime_eligibility(earliest_time, latest_time):
+    movie = make_movie_version(1)
+    jour = date(2020, 3, 4)
+    showtimes = [
+        Showtime(
+            date_time=datetime(2020, 3, 4, hour, minute),
+            end_time=datetime(2020, 3, 4, hour, minute) + timedelta(minutes=105)
+            if hour % 2
+            else None,
+            movie=movie,
+        )
+        for hour in range(10, 23)
+        for minute in (0, 30)
+    ]
+    showtime_filter = ShowtimeFilter(earliest_time=earliest_time, latest_time=latest_time)
+
+    assert [showtime_filter(s, jour) for s in showtimes] == [
+        check_showtime_eligibility(s, jour, earliest_time, latest_time) for s in showtimes
+    ]
+
+
+def test_get_showings_ndjson_streams_a_line_per_cinema(monkeypatch):
+    days = {"2020-03-04": ["14:00"]}
+    codes = [f"P{i:04d}" for i in range(1, DEFAULT_PAGE_SIZE + 3)]  # 2 pages
+    fake_client = FakeClient([
+        make_theater_showtimes(code, [make_raw_movie_showtime(1001, "Film A", days)])
+        for code in codes
+    ])
+    monkeypatch.setattr(Client, "_instance", fake_client)
+    lines = get_showings(",".join(codes), semaine=False, format="ndjson")
+
+    first_line = next(lines)
+    assert first_line.endswith("\n") and first_line.count("\n") == 1
+    assert json.loads(first_line)["cinema"]["allocine_id"] == "P0001"
+    showtimelists = [call for call in fake_client.calls if call[0] == "showtimelist"]
+    assert showtimelists == [("showtimelist", (tuple(codes[:DEFAULT_PAGE_SIZE]), 1))]
+
+    first_page = [first_line] + [next(lines) for _ in range(DEFAULT_PAGE_SIZE - 1)]
+    assert fake_client.count("showtimelist") == 1  # The second page is not requested yet
+    last_page = list(lines)
+    assert fake_client.count("showtimelist") == 2
+    assert [json.loads(line)["cinema"]["allocine_id"] for line in first_page + last_page] == codes
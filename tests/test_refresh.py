@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the stale-while-revalidate refresh of the hot cinemas."""
+
+# To be tested with : python3 -m pytest -vs tests/test_refresh.py
+
+import threading
+from datetime import timedelta
+
+from allocine import RefreshScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingFetch:
+    """Returns "<id>-<number of fetches>", the background fetches wait for `release`"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, allocine_cinema_id):
+        self.calls.append(allocine_cinema_id)
+        if len(self.calls) > 2:
+            self.release.wait(5)
+        return f"{allocine_cinema_id}-{len(self.calls)}"
+
+
+def make_scheduler(fetch, clock, **kwargs):
+    return RefreshScheduler(fetch, ttl=timedelta(minutes=30), clock=clock, **kwargs)
+
+
+def test_stale_value_is_served_while_refreshing():
+    clock, fetch = FakeClock(), BlockingFetch()
+    scheduler = make_scheduler(fetch, clock)
+    assert scheduler.get("P0001") == "P0001-1"
+    assert scheduler.get("P0002") == "P0002-2"
+
+    clock.now += timedelta(minutes=31).total_seconds()
+    assert scheduler.get("P0001") == "P0001-1"  # Stale, and the refresh is blocked
+    assert scheduler.get("P0001") == "P0001-1"  # Only one refresh in flight
+    assert scheduler.stats()["in_flight"] == 1
+
+    fetch.release.set()
+    scheduler.stop(wait=True)
+    assert scheduler.get("P0001") == "P0001-3"
+    assert fetch.calls == ["P0001", "P0002", "P0001"]
+
+
+def test_hottest_entries_are_refreshed_ahead_within_the_budget():
+    clock, fetch = FakeClock(), BlockingFetch()
+    fetch.release.set()
+    scheduler = make_scheduler(fetch, clock, budget=1, max_hot=2)
+    for code, accesses in (("P0001", 3), ("P0002", 2), ("P0003", 1)):
+        for _ in range(accesses):
+            scheduler.get(code)
+
+    assert scheduler.tick() == []  # Nothing expires within 5 minutes
+    clock.now += timedelta(minutes=26).total_seconds()
+    assert scheduler.tick() == ["P0001"]  # P0002 is over the budget, P0003 is not hot
+    scheduler.stop(wait=True)
+
+    stats = scheduler.stats()
+    assert (stats["refreshes"], stats["skipped"]) == (1, 1)
+    assert scheduler.get("P0001") == "P0001-4"
+
+
+def test_entries_are_bounded():
+    clock, fetch = FakeClock(), BlockingFetch()
+    fetch.release.set()
+    scheduler = make_scheduler(fetch, clock, max_entries=2)
+    for code, accesses in (("P0001", 3), ("P0002", 1), ("P0003", 1)):
+        clock.now += 1
+        for _ in range(accesses):
+            scheduler.get(code)
+    assert sorted(scheduler._entries) == ["P0001", "P0003"]  # The least accessed is evicted
+
+    clock.now += timedelta(minutes=31).total_seconds()
+    scheduler.get("P0004")  # The expired ones are evicted first
+    assert sorted(scheduler._entries) == ["P0004"]
+    assert scheduler.stats()["evictions"] == 3
+    scheduler.stop(wait=True)
+
+
+def test_stale_value_is_fetched_synchronously_once_stopped():
+    clock, fetch = FakeClock(), BlockingFetch()
+    fetch.release.set()
+    scheduler = make_scheduler(fetch, clock)
+    assert scheduler.get("P0001") == "P0001-1"
+    scheduler.stop(wait=True)
+
+    clock.now += timedelta(minutes=31).total_seconds()
+    assert scheduler.tick() == []  # Nothing is submitted to the stopped executor
+    assert scheduler.get("P0001") == "P0001-2"
+    assert scheduler.get("P0001") == "P0001-2"
+
+    def failing_fetch(allocine_cinema_id):
+        raise ConnectionError(allocine_cinema_id)
+
+    scheduler.fetch = failing_fetch
+    clock.now += timedelta(minutes=31).total_seconds()
+    assert scheduler.get("P0001") == "P0001-2"  # The stale value is kept
+    assert scheduler.stats()["failures"] == 1
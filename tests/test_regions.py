@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the cinemas of a region (offline, with a fake client)."""
+
+# To be tested with : python3 -m pytest -vs tests/test_regions.py
+
+import pytest
+
+import allocine.core
+from allocine import Allocine, MovieCache
+from conftest import (
+    FakeClient,
+    make_raw_movie_showtime,
+    make_showtimelist,
+    make_theater_showtimes,
+)
+
+
+def test_get_cinemas_from_geocode(fake_client):
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache())
+    cinemas = allocine.get_cinemas_from_geocode(83165)
+
+    assert [c.allocine_id for c in cinemas] == ["P0001", "P0002"]
+    assert len(cinemas[1].showtimes) == 6
+    # The showtimes come from the geocode page : no showtimelist per cinema
+    assert fake_client.count("geocode") == 1
+    assert fake_client.count("showtimelist") == 0
+    assert fake_client.count("theater") == 2
+
+
+def test_get_cinemas_batches_theaters():
+    days = {"2020-03-04": ["14:00"]}
+    codes = [f"P{i:04d}" for i in range(15)]
+    fake_client = FakeClient(
+        [
+            make_theater_showtimes(code, [make_raw_movie_showtime(1001, "Film A", days)])
+            for code in codes
+        ]
+    )
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache())
+    cinemas = allocine.get_cinemas(list(reversed(codes)))
+
+    assert [c.allocine_id for c in cinemas] == list(reversed(codes))
+    assert fake_client.count("showtimelist") == 2  # 2 pages of 10 theaters
+
+
+def test_lazy_details_need_a_single_request(fake_client):
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache(), lazy_details=True)
+    cinema = allocine.get_cinemas(["P0001"])[0]
+    movie = cinema.showtimes[0].movie
+
+    assert (movie.title, movie.version, movie.duration_str) == ("Film A", "VF", "01h30")
+    assert len(fake_client.calls) == 1  # Only the showtimelist
+    assert not movie.details_loaded
+
+    assert movie.directors == "A. Réalisateur"
+    assert movie.genres == "Drame, Comédie"
+    assert cinema.member_cards[0]["code"] == 106002
+    assert (fake_client.count("movie"), fake_client.count("theater")) == (1, 1)
+
+
+def test_member_cards_prefetched_concurrently(theaters):
+    fake_client = FakeClient(theaters, delay=0.05)
+    allocine = Allocine(
+        client=fake_client, movie_cache=MovieCache(), lazy_details=True, prefetch_member_cards=True
+    )
+    cinemas = allocine.get_cinemas(["P0001", "P0002"])
+
+    assert fake_client.count("theater") == 2
+    assert fake_client.max_in_flight == 2  # Not one request per cinema while displaying
+    assert [c.member_cards[0]["code"] for c in cinemas] == [106002, 106002]
+    assert (fake_client.count("theater"), fake_client.count("movie")) == (2, 0)
+
+
+def test_get_cinemas_unknown_id(fake_client):
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache())
+    with pytest.raises(ValueError):
+        allocine.get_cinemas(["P0001", "UNKNOWN"])
+
+
+def test_geocode_pagination_is_complete():
+    days = {"2020-03-04": ["14:00"]}
+    codes = [f"P{i:04d}" for i in range(25)]
+    fake_client = FakeClient(
+        [
+            make_theater_showtimes(code, [make_raw_movie_showtime(1001, "Film A", days)])
+            for code in codes
+        ]
+    )
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache(), page_size=10)
+
+    assert allocine.get_cinema_ids(83165) == codes
+    assert fake_client.count("geocode") == 3
+
+    cinemas = allocine.get_cinemas_from_geocode(83165)
+    assert [c.allocine_id for c in cinemas] == codes
+
+
+def test_geocode_pages_are_deduplicated(fake_client):
+    # Both theaters are returned twice, as if the results had moved between 2 pages
+    fake_client.get_showtimelist_from_geocode = lambda geocode, page, count: make_showtimelist(
+        list(fake_client.theaters.values()), total_results=4
+    )
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache(), page_size=2)
+    cinemas = allocine.get_cinemas_from_geocode(83165)
+
+    assert [c.allocine_id for c in cinemas] == ["P0001", "P0002"]
+
+
+def test_iter_cinemas_has_bounded_lookahead():
+    days = {"2020-03-04": ["14:00"]}
+    codes = [f"P{i:04d}" for i in range(45)]
+    fake_client = FakeClient(
+        [
+            make_theater_showtimes(code, [make_raw_movie_showtime(1001, "Film A", days)])
+            for code in codes
+        ]
+    )
+    allocine = Allocine(client=fake_client, movie_cache=MovieCache(), page_size=10)
+    cinemas = allocine.iter_cinemas(83165, lookahead=1)
+
+    assert next(cinemas).allocine_id == "P0000"
+    assert fake_client.count("geocode") <= 2  # Page 1, and maybe page 2
+    cinemas.close()
+
+    cinemas = list(allocine.iter_cinemas(83165))
+    assert [c.allocine_id for c in cinemas] == codes
+
+
+def test_each_movie_info_is_decoded_once(fake_client, monkeypatch):
+    decoded = []
+    decode_movie_info = allocine.core.decode_movie_info
+    monkeypatch.setattr(
+        allocine.core, "decode_movie_info", lambda info: decoded.append(info["code"]) or decode_movie_info(info)
+    )
+    cinemas = Allocine(client=fake_client, movie_cache=MovieCache()).get_cinemas_from_geocode(83165)
+
+    # Film A is shown in both cinemas, on 2 days
+    assert sorted(decoded) == [1001, 1002, 1003, 1004]
+    assert cinemas[0].showtimes[0].movie.synopsis == cinemas[1].showtimes[0].movie.synopsis
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the record/replay transports and the local fake API (offline)."""
+
+# To be tested with : python3 -m pytest -vs tests/test_replay.py
+
+from datetime import date
+
+import pytest
+import requests
+
+from allocine import Allocine, MovieCache
+from allocine.client import Client
+from allocine.constants import BASE_URL
+from allocine.ratelimit import AdaptiveRateLimiter
+from allocine.replay import (
+    FixtureStore,
+    MissingFixture,
+    RecordingTransport,
+    ReplayTransport,
+    fixture_key,
+)
+from allocine.transport import RequestsTransport
+from benchmarks.fake_api import FakeAllocineServer, RegionTransport
+
+
+def make_client(base_url, transport):
+    limiter = AdaptiveRateLimiter()  # Not paced without 503
+    return Client(base_url, transport=transport, rate_limiter=limiter, shared=False)
+
+
+def test_fixture_key_ignores_the_host_and_the_partner():
+    assert fixture_key(f"{BASE_URL}/movie?partner=1&format=json&code=2") == fixture_key(
+        "http://127.0.0.1:8765/rest/v3/movie?code=2&format=json&partner=3"
+    )
+
+
+def test_record_then_replay(tmp_path):
+    region = RegionTransport.from_region(n_theaters=3, first_day=date.today())
+    store = FixtureStore(tmp_path)
+    recording = make_client(BASE_URL, RecordingTransport(region, store))
+    recorded = Allocine(client=recording, movie_cache=MovieCache()).get_cinema("C0001")
+    with pytest.raises(ValueError):
+        recording.get_cinema_info_by_id("UNKNOWN")  # The errors are recorded too
+
+    replay = make_client(BASE_URL, ReplayTransport(FixtureStore(tmp_path)))
+    replayed = Allocine(client=replay, movie_cache=MovieCache()).get_cinema("C0001")
+    assert [str(s) for s in replayed.showtimes] == [str(s) for s in recorded.showtimes]
+    assert replayed.showtimes[0].movie.synopsis == recorded.showtimes[0].movie.synopsis
+    with pytest.raises(ValueError):
+        replay.get_cinema_info_by_id("UNKNOWN")
+    with pytest.raises(MissingFixture):
+        replay.get_cinema_info_by_id("C0002")
+    assert len(store) == len({s.movie.movie_id for s in recorded.showtimes}) + 3
+
+
+def test_fake_api_server_with_injected_errors():
+    region = RegionTransport.from_region(n_theaters=2, first_day=date.today())
+    with FakeAllocineServer(region, error_rate=0.5, seed=1) as server:
+        statuses = [
+            requests.get(f"{server.base_url}/theater?format=json&code=C0000").status_code
+            for _ in range(20)
+        ]
+        assert set(statuses) == {200, 503}
+        assert server.stats() == {"requests": 20, "errors": statuses.count(503)}
+
+    with FakeAllocineServer(region) as server:
+        client = make_client(server.base_url, RequestsTransport())
+        cinema = Allocine(client=client, movie_cache=MovieCache()).get_cinema("C0000")
+        assert len(cinema.showtimes) > 0
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the cache of the rendered responses of the Flask app."""
+
+# To be tested with : python3 -m pytest -vs tests/test_wsgi.py
+
+import threading
+import time
+
+import pytest
+
+import wsgi
+from app.http_cache import RenderedSnapshot
+
+
+@pytest.fixture
+def rendered_calls(monkeypatch):
+    calls = []
+
+    def fake_get_showings(allocine_cinema_id, **kwargs):
+        calls.append((allocine_cinema_id, kwargs["earliest_time"], kwargs["latest_time"]))
+        yield '{"cinema": "%s"}' % allocine_cinema_id
+
+    monkeypatch.setattr(wsgi, "get_showings", fake_get_showings)
+    return calls
+
+
+def make_client(**config):
+    config = dict({"TESTING": True, "RESPONSE_CACHE_PATH": None}, **config)
+    return wsgi.create_app(config).test_client()
+
+
+def test_showings_are_cached_with_etag(rendered_calls):
+    client = make_client()
+    response = client.get("/showings/P0001?start=9:00")
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == '{"cinema": "P0001"}'
+    assert "max-age=600" in response.headers["Cache-Control"]
+    assert not etag.startswith("W/")
+
+    # Equivalent arguments share the entry, and If-None-Match gets a 304
+    response = client.get("/showings/P0001?start=09:00", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert client.get("/showings/P0001?start=09:00&end=").get_data(as_text=True) == '{"cinema": "P0001"}'
+    assert rendered_calls == [("P0001", "09:00", None)]
+
+    client.get("/showings/P0002")
+    assert len(rendered_calls) == 2
+
+
+def test_showings_ndjson_are_streamed(monkeypatch):
+    def fake_get_showings(allocine_cinema_id, **kwargs):
+        assert kwargs["format"] == "ndjson"
+        for code in allocine_cinema_id.split(","):
+            yield '{"cinema":"%s"}\n' % code
+
+    monkeypatch.setattr(wsgi, "get_showings", fake_get_showings)
+    client = make_client()
+    response = client.get("/showings/P0001,P0002", headers={"Accept": "application/x-ndjson"})
+
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+    assert "ETag" not in response.headers
+    assert response.get_data(as_text=True).splitlines() == ['{"cinema":"P0001"}', '{"cinema":"P0002"}']
+    assert client.get("/showings/P0001?format=ndjson").mimetype == "application/x-ndjson"
+
+
+def test_rendered_cache_can_be_disabled(rendered_calls):
+    client = make_client(RENDERED_RESPONSE_TTL=0)
+    client.get("/showings/P0001")
+    response = client.get("/showings/P0001")
+
+    assert "ETag" not in response.headers
+    assert len(rendered_calls) == 2
+
+
+def test_cinemas_are_served_from_the_snapshot(monkeypatch):
+    renders = []
+
+    def fake_get_cinemas(format, cache):
+        renders.append(format)
+        return '[{"allocine_id": "P%04d"}]' % len(renders)
+
+    monkeypatch.setattr(wsgi, "get_cinemas", fake_get_cinemas)
+    client = make_client()
+    first = client.get("/cinemas/")
+    assert client.get("/cinemas/").get_data() == first.get_data() == b'[{"allocine_id": "P0001"}]'
+    assert len(renders) == 1
+
+    client.application.extensions["cinemas_snapshot"].refresh()
+    response = client.get("/cinemas/", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200  # The snapshot was replaced
+    assert response.get_data() == b'[{"allocine_id": "P0002"}]'
+
+
+def test_testing_app_starts_no_snapshot_thread(monkeypatch):
+    monkeypatch.setattr(wsgi, "get_cinemas", lambda format, cache: "[]")
+    snapshot = make_client().application.extensions["cinemas_snapshot"]
+    assert snapshot._thread is None and not snapshot.running
+
+    registered = []
+    monkeypatch.setattr(wsgi.atexit, "register", registered.append)
+    snapshot = make_client(CINEMAS_SNAPSHOT_REFRESH=True).application.extensions["cinemas_snapshot"]
+    assert snapshot.running and registered == [snapshot.stop]
+    snapshot.stop()
+    snapshot._thread.join(1)
+    assert not snapshot._thread.is_alive()
+
+
+def test_snapshot_without_thread_is_rebuilt_when_expired():
+    now = [0.0]
+    bodies = iter(["[1]", "[2]"])
+    snapshot = RenderedSnapshot(lambda: next(bodies), interval=60, clock=lambda: now[0])
+    assert snapshot.get().body == snapshot.get().body == b"[1]"
+    now[0] = 60
+    assert snapshot.get().body == b"[2]"
+    assert snapshot.refreshes == 2
+
+
+def test_snapshot_is_rebuilt_when_its_thread_is_gone():
+    now = [0.0]
+    bodies = iter(["[1]", "[2]"])
+    snapshot = RenderedSnapshot(lambda: next(bodies), interval=60, clock=lambda: now[0])
+    snapshot._thread = threading.Thread(target=lambda: None)  # Like the thread of a parent process
+    assert snapshot.get().body == b"[1]"
+    now[0] = 60
+    assert not snapshot.running
+    assert snapshot.get().body == b"[2]"
+
+
+def test_snapshot_keeps_the_former_body_when_a_refresh_fails():
+    bodies = iter(["[1]"])
+    snapshot = RenderedSnapshot(lambda: next(bodies), interval=0.01)
+    snapshot.start(warm_up=True)
+    try:
+        assert snapshot.get().body == b"[1]"
+        for _ in range(500):  # StopIteration at the next refresh
+            if snapshot.failures:
+                break
+            time.sleep(0.01)
+        assert snapshot.get().body == b"[1]"
+        assert snapshot.refreshes == 1
+    finally:
+        snapshot.stop()
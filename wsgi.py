@@ -1,6 +1,16 @@
+import atexit
 import os
+from datetime import date
 from flask import Flask, request
+from allocine.cache import ResponseCache
 from app.cinemas import get_cinemas
+from app.http_cache import (
+    DEFAULT_RESPONSE_TTL,
+    DEFAULT_SNAPSHOT_INTERVAL,
+    RenderedCache,
+    RenderedSnapshot,
+    normalize_hour,
+)
 
 from app.main import get_showings
 
@@ -10,6 +20,11 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY='dev',
         DATABASE=os.path.join(app.instance_path, 'flaskr.sqlite'),
+        RESPONSE_CACHE_PATH=os.path.join(app.instance_path, 'responses.sqlite'),
+        RENDERED_RESPONSE_TTL=DEFAULT_RESPONSE_TTL,  # In seconds, 0 to disable
+        CINEMAS_SNAPSHOT_INTERVAL=DEFAULT_SNAPSHOT_INTERVAL,  # In seconds
+        CINEMAS_SNAPSHOT_REFRESH=None,  # Rebuild it in a background thread (None : unless TESTING)
+        CINEMAS_SNAPSHOT_WARMUP=True,  # Build the /cinemas/ snapshot at startup
         CORS_HEADERS='Content-Type'
     )
 
@@ -26,6 +41,44 @@ def create_app(test_config=None):
     except OSError:
         pass
 
+    # cache of the Allociné responses, shared by every request (None to disable)
+    cache = None
+    if app.config['RESPONSE_CACHE_PATH']:
+        cache = ResponseCache(app.config['RESPONSE_CACHE_PATH'])
+
+    # cache of the rendered responses, answering If-None-Match without any request
+    rendered_cache = RenderedCache(ttl=app.config['RENDERED_RESPONSE_TTL'])
+
+    # /cinemas/ is served from a snapshot, rebuilt in the background
+    cinemas_snapshot = RenderedSnapshot(
+        lambda: get_cinemas(format='json', cache=cache),
+        interval=app.config['CINEMAS_SNAPSHOT_INTERVAL'],
+    )
+    background_refresh = app.config['CINEMAS_SNAPSHOT_REFRESH']
+    if background_refresh is None:
+        background_refresh = not app.testing
+    if background_refresh:
+        cinemas_snapshot.start(warm_up=app.config['CINEMAS_SNAPSHOT_WARMUP'])
+        atexit.register(cinemas_snapshot.stop)
+    app.extensions['cinemas_snapshot'] = cinemas_snapshot
+
+    def json_response(entry, max_age):
+        response = app.response_class(
+            response=entry.body,
+            status=200,
+            mimetype='application/json'
+        )
+        response.set_etag(entry.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response.make_conditional(request)  # 304 if If-None-Match matches
+
+    def cached_json_response(key, render):
+        if not rendered_cache.ttl:
+            return app.response_class(response=render(), status=200, mimetype='application/json')
+        entry = rendered_cache.get_or_render(key, render)
+        return json_response(entry, rendered_cache.max_age(entry))
+
     # a simple page that says hello
     @app.route('/hello/<id>')
     def hello(id):
@@ -34,32 +87,46 @@ def create_app(test_config=None):
     # get cinema list
     @app.route('/cinemas/')
     def cinemas():
-        data = get_cinemas(format='json')
-
-        response = app.response_class(
-            response=data,
-            status=200,
-            mimetype='application/json'
-        )
-        return response
+        entry = cinemas_snapshot.get()
+        return json_response(entry, cinemas_snapshot.max_age(entry))
 
     @app.route('/showings/<allocine_cinema_id>')
     def showings(allocine_cinema_id):
         args = request.args
 
-        earliest_time = args.get("start", default=None, type=str)
-        latest_time = args.get("end", default=None, type=str)
+        earliest_time = normalize_hour(args.get("start", default=None, type=str))
+        latest_time = normalize_hour(args.get("end", default=None, type=str))
+        links = args.get("links", default="1", type=str) not in ("0", "false")
 
-        data = get_showings(
-            allocine_cinema_id,
-            format='json',
-            earliest_time=earliest_time,
-            latest_time=latest_time,
-        )
-        response = app.response_class(
-            response=data,
-            status=200,
-            mimetype='application/json',
+        if args.get("format") == "ndjson" or request.accept_mimetypes.best == 'application/x-ndjson':
+            # One line per cinema, sent as soon as it is loaded (not cached)
+            response = app.response_class(
+                response=get_showings(
+                    allocine_cinema_id,
+                    format='ndjson',
+                    earliest_time=earliest_time,
+                    latest_time=latest_time,
+                    cache=cache,
+                    links=links,
+                ),
+                status=200,
+                mimetype='application/x-ndjson',
+            )
+            response.headers.add("Access-Control-Allow-Origin", "*")
+            return response
+
+        # The showings of the day change at midnight
+        key = ('showings', allocine_cinema_id, earliest_time, latest_time, links, date.today())
+        response = cached_json_response(
+            key,
+            lambda: "".join(get_showings(
+                allocine_cinema_id,
+                format='json',
+                earliest_time=earliest_time,
+                latest_time=latest_time,
+                cache=cache,
+                links=links,
+            )),
         )
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response